@@ -4,6 +4,7 @@
  */
 
 let assignments = [];
+let assignmentsVersion = null;
 let courses = [];
 let collegeName = null;
 let pendingReminderAssignmentId = null;
@@ -45,6 +46,7 @@ function setButtonVisualState(button, disabled, disabledTitle) {
 
 function updateSyncButtonState() {
     const btn = document.getElementById('syncBtn');
+    const fullSyncBtn = document.getElementById('fullSyncBtn');
     if (!btn) return;
     let disabled = false;
     let reason;
@@ -67,6 +69,7 @@ function updateSyncButtonState() {
     }
 
     setButtonVisualState(btn, disabled, reason);
+    setButtonVisualState(fullSyncBtn, disabled, reason);
 }
 
 function refreshPrimaryButtonsState() {
@@ -89,7 +92,8 @@ document.addEventListener('DOMContentLoaded', async () => {
     attachAISummaryListeners();
 
     document.getElementById('addClassBtn').addEventListener('click', openAddClassModal);
-    document.getElementById('syncBtn').addEventListener('click', syncAssignments);
+    document.getElementById('syncBtn').addEventListener('click', () => syncAssignments());
+    document.getElementById('fullSyncBtn').addEventListener('click', () => syncAssignments(true));
 
     document.getElementById('aiInsightsBtn').addEventListener('click', () => {
         const btn = document.getElementById('aiInsightsBtn');
@@ -175,30 +179,94 @@ document.addEventListener('DOMContentLoaded', async () => {
         }
     });
 });
-async function loadAssignments() {
-    try {
-        const response = await fetch('/api/assignments');
+const ASSIGNMENT_PAGE_SIZE = 200;
+const ASSIGNMENT_LIST_FIELDS = [
+    'assignment_id', 'title', 'due_at', 'course_name', 'reminder_list', 'ai_notes', 'reminder_added',
+    'status', 'priority', 'user_notes', 'deleted', 'time_estimate', 'suggested_priority',
+    'ai_confidence', 'ai_confidence_explanation'
+].join(',');
+
+async function fetchAssignmentPages(onPage) {
+    let cursor = null;
+    let version = null;
+    do {
+        const params = new URLSearchParams({ limit: ASSIGNMENT_PAGE_SIZE, fields: ASSIGNMENT_LIST_FIELDS });
+        if (cursor) params.set('cursor', cursor);
+        const response = await fetch(`/api/assignments?${params}`);
         const data = await response.json();
         if (data.error) {
-            console.error('Error loading assignments:', data.error);
-            assignments = [];
-        } else {
-            assignments = data;
-            await populateSidebarCourses();
-            await filterAssignments();
-            attachReminderListeners();
-            attachAISummaryListeners();
+            throw new Error(data.error);
+        }
+        if (version === null) {
+            version = parseInt(response.headers.get('X-Data-Version'), 10);
+        }
+        await onPage(data.assignments);
+        cursor = data.next_cursor;
+    } while (cursor);
+    return Number.isNaN(version) ? null : version;
+}
+
+async function renderLoadedAssignments() {
+    await populateSidebarCourses();
+    await filterAssignments();
+    attachReminderListeners();
+    attachAISummaryListeners();
+}
+
+async function loadAssignments() {
+    try {
+        const loaded = [];
+        let pageCount = 0;
+        assignmentsVersion = await fetchAssignmentPages(async page => {
+            loaded.push(...page);
+            pageCount += 1;
+            if (pageCount === 1) {
+                assignments = loaded.slice();
+                await renderLoadedAssignments();
+            }
+        });
+        if (pageCount > 1) {
+            assignments = loaded;
+            await renderLoadedAssignments();
         }
         refreshPrimaryButtonsState();
     } catch (error) {
         console.error('Error loading assignments:', error);
         assignments = [];
+        assignmentsVersion = null;
         await populateSidebarCourses();
         displayAssignments([]);
         refreshPrimaryButtonsState();
     }
 }
 
+async function refreshAssignments() {
+    if (assignmentsVersion === null) {
+        await loadAssignments();
+        return;
+    }
+    try {
+        const params = new URLSearchParams({ since: assignmentsVersion, fields: ASSIGNMENT_LIST_FIELDS });
+        const response = await fetch(`/api/assignments/changes?${params}`);
+        const data = await response.json();
+        if (data.error) {
+            throw new Error(data.error);
+        }
+        if (data.upserted.length > 0 || data.deleted.length > 0) {
+            const byId = new Map(assignments.map(a => [a.assignment_id, a]));
+            data.deleted.forEach(id => byId.delete(id));
+            data.upserted.forEach(a => byId.set(a.assignment_id, a));
+            assignments = Array.from(byId.values());
+            await renderLoadedAssignments();
+        }
+        assignmentsVersion = data.version;
+        refreshPrimaryButtonsState();
+    } catch (error) {
+        console.error('Error refreshing assignments:', error);
+        await loadAssignments();
+    }
+}
+
 function updateAIInsightsButtonState() {
     const btn = document.getElementById('aiInsightsBtn');
     if (!btn) return;
@@ -719,7 +787,7 @@ async function toggleCourseEnabled(courseName, courseItem, actionButton) {
     }
 }
 
-async function syncAssignments() {
+async function syncAssignments(fullSync = false) {
     const needsSetup = await checkSetupRequired();
     if (needsSetup) {
         showSetupModal();
@@ -745,7 +813,7 @@ async function syncAssignments() {
         return;
     }
 
-    await performSync();
+    await performSync(fullSync);
 }
 
 async function checkSetupRequired() {
@@ -1055,7 +1123,7 @@ function showSetupWarning(message) {
     }
 }
 
-async function performSync() {
+async function performSync(fullSync = false) {
     const btn = document.getElementById('syncBtn');
     const aiInsightsBtn = document.getElementById('aiInsightsBtn');
     const settingsBtn = document.getElementById('settingsBtn');
@@ -1086,7 +1154,7 @@ async function performSync() {
     progressBar.style.backgroundColor = '';
 
     try {
-        const eventSource = new EventSource('/api/sync?ai_enabled=true');
+        const eventSource = new EventSource(fullSync ? '/api/sync?ai_enabled=true&full=1' : '/api/sync?ai_enabled=true');
 
         eventSource.onmessage = async (event) => {
             try {
@@ -1100,7 +1168,11 @@ async function performSync() {
                         progressCount.textContent = `${data.assignment_count} assignment${data.assignment_count !== 1 ? 's' : ''} found`;
                     }
 
-                    progressTime.textContent = '';
+                    if (data.ai_partial) {
+                        progressTime.textContent = `${data.ai_partial.title}: ${data.ai_partial.fields}/${data.ai_partial.total} fields`;
+                    } else {
+                        progressTime.textContent = '';
+                    }
 
                     if (data.assignment) {
                         const existingIndex = assignments.findIndex(a => a.assignment_id === data.assignment.assignment_id);
@@ -1122,7 +1194,10 @@ async function performSync() {
                     eventSource.close();
                     progressBar.style.width = '100%';
 
-                    if (data.total_added > 0) {
+                    if (data.failed_courses && data.failed_courses.length > 0) {
+                        const names = data.failed_courses.map(c => c.name).join(', ');
+                        showStatus(`Synced ${data.total_added} new assignments, but Canvas could not be reached for: ${names}. Try syncing again later.`, 'error');
+                    } else if (data.total_added > 0) {
                         showStatus(`Successfully synced ${data.total_added} new assignments!`, 'success');
                     } else {
                         showStatus('No new assignments to add. You\'re all caught up!', 'info');
@@ -1130,7 +1205,7 @@ async function performSync() {
 
                     progressContainer.style.display = 'none';
 
-                    await loadAssignments();
+                    await refreshAssignments();
                     await loadCourses();
                     const settingsModal = document.getElementById('settingsModal');
                     if (settingsModal.style.display === 'block') {
@@ -1319,7 +1394,7 @@ async function saveAndSync() {
             }
         }
 
-        await loadAssignments();
+        await refreshAssignments();
         await loadCourses();
         await populateSidebarCourses();
 
@@ -1427,7 +1502,7 @@ async function saveSettings() {
             reminderListChanges = {};
 
             showSettingsWarning('Settings saved!', 'success');
-            await loadAssignments();
+            await refreshAssignments();
             await loadCoursesInSettings();
             await loadCourses();
 
@@ -1518,7 +1593,7 @@ async function editManualCourseName(courseName, currentName) {
                 } catch (_) {}
 
                 await loadCourses();
-                await loadAssignments();
+                await refreshAssignments();
                 await loadCoursesInSettings();
                 await populateSidebarCourses();
                 showSettingsWarning('Course updated successfully', 'success');
@@ -1542,7 +1617,7 @@ async function editManualCourseName(courseName, currentName) {
             if (data.success) {
 
                 try {
-                    const assignmentsResp = await fetch('/api/assignments');
+                    const assignmentsResp = await fetch(`/api/assignments?course=${encodeURIComponent(courseName)}&fields=assignment_id,course_name`);
                     const assignmentsData = await assignmentsResp.json();
                     if (Array.isArray(assignmentsData)) {
                         const assignmentsToUpdate = assignmentsData.filter(a => a && a.course_name === courseName);
@@ -1572,7 +1647,7 @@ async function editManualCourseName(courseName, currentName) {
                 } catch (_) {}
 
                 await loadCourses();
-                await loadAssignments();
+                await refreshAssignments();
                 await loadCoursesInSettings();
                 await populateSidebarCourses();
                 showSettingsWarning('Course renamed successfully', 'success');
@@ -1603,7 +1678,7 @@ async function deleteManualCourse(courseName) {
         if (data.success) {
 
             try {
-                const assignmentsResp = await fetch('/api/assignments');
+                const assignmentsResp = await fetch(`/api/assignments?course=${encodeURIComponent(courseName)}&fields=assignment_id,course_name`);
                 const assignmentsData = await assignmentsResp.json();
                 if (Array.isArray(assignmentsData)) {
                     const assignmentsToDelete = assignmentsData.filter(a => a && a.course_name === courseName);
@@ -1618,7 +1693,7 @@ async function deleteManualCourse(courseName) {
             } catch (_) {}
 
             await loadCourses();
-            await loadAssignments();
+            await refreshAssignments();
             await loadCoursesInSettings();
             await populateSidebarCourses();
         } else {
@@ -2213,7 +2288,7 @@ async function generateAISummary(assignmentId, buttonElement) {
 
             const assignmentToUpdate = assignments.find(a => a.assignment_id === assignmentId);
             if (assignmentToUpdate) {
-                await loadAssignments();
+                await refreshAssignments();
             }
         }
     } catch (error) {
@@ -2276,7 +2351,7 @@ async function removeAISummary(assignmentId, buttonElement) {
             })
         });
 
-        await loadAssignments();
+        await refreshAssignments();
     } catch (error) {
         showStatus('Error removing AI summary: ' + error.message, 'error');
         buttonElement.disabled = false;
@@ -2317,7 +2392,7 @@ async function addReminder(assignmentId, buttonElement) {
 
         let assignment = assignments.find(a => a.assignment_id === assignmentId);
         if (!assignment) {
-            await loadAssignments();
+            await refreshAssignments();
             assignment = assignments.find(a => a.assignment_id === assignmentId);
             if (!assignment) {
                 showStatus('Assignment not found. Please refresh the page.', 'error');
@@ -2347,7 +2422,7 @@ async function addReminder(assignmentId, buttonElement) {
         } else {
             showStatus('Reminder added successfully!', 'success');
 
-            await loadAssignments();
+            await refreshAssignments();
         }
     } catch (error) {
         showStatus('Error adding reminder: ' + error.message, 'error');
@@ -2389,7 +2464,7 @@ async function removeReminder(assignmentId, buttonElement) {
 
         let assignment = assignments.find(a => a.assignment_id === assignmentId);
         if (!assignment) {
-            await loadAssignments();
+            await refreshAssignments();
             assignment = assignments.find(a => a.assignment_id === assignmentId);
             if (!assignment) {
                 showStatus('Assignment not found. Please refresh the page.', 'error');
@@ -2418,7 +2493,7 @@ async function removeReminder(assignmentId, buttonElement) {
             buttonElement.disabled = false;
             buttonElement.textContent = 'Added';
         } else {
-            await loadAssignments();
+            await refreshAssignments();
         }
     } catch (error) {
         showStatus('Error removing reminder: ' + error.message, 'error');
@@ -2561,7 +2636,7 @@ async function restoreAssignment(assignmentId) {
         const data = await response.json();
         if (data.success) {
             showStatus('Assignment restored', 'success');
-            await loadAssignments();
+            await refreshAssignments();
             if (currentFilter === 'deleted') {
                 displayDeletedAssignmentsInMainView();
             } else {
@@ -2592,7 +2667,7 @@ async function permanentlyDeleteAssignment(assignmentId) {
             if (currentFilter === 'deleted') {
                 displayDeletedAssignmentsInMainView();
             } else {
-                await loadAssignments();
+                await refreshAssignments();
                 await filterAssignments();
             }
         } else {
@@ -2613,7 +2688,7 @@ async function deleteAssignment(assignmentId) {
         const data = await response.json();
         if (data.success) {
             focusedAssignmentId = null;
-            await loadAssignments();
+            await refreshAssignments();
             if (currentFilter === 'deleted') {
                 displayDeletedAssignmentsInMainView();
             } else {
@@ -3153,7 +3228,7 @@ async function saveInlineAssignment(courseName, displayCourseName, useAI = false
             } else {
                 progressText.textContent = 'Assignment added successfully!';
             }
-            await loadAssignments();
+            await refreshAssignments();
             await updateStats();
             updateAddAssignmentButtonsState();
 
@@ -3189,7 +3264,7 @@ async function waitForAISummary(targetAssignmentId, pollIntervalMs = 1500, timeo
             return true;
         }
         try {
-            await loadAssignments();
+            await refreshAssignments();
             const b = assignments.find(x => x && x.assignment_id === targetAssignmentId);
             if (b && b.ai_notes && String(b.ai_notes).trim().length > 0) {
                 return true;
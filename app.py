@@ -5,7 +5,8 @@ Handles API routes, Canvas integration, assignment syncing, and AI insights gene
 
 import os
 import json
-import requests
+import base64
+import hashlib
 import sqlite3
 import time
 import traceback
@@ -15,40 +16,70 @@ EST = ZoneInfo("America/New_York")
 from flask import Flask, render_template, jsonify, request, send_from_directory, Response, stream_with_context
 from dotenv import load_dotenv
 from pathlib import Path
-from backend import Database, AIEnhancer, RemindersManager, CanvasAPI, AssignmentProcessor
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from backend import Database, AIEnhancer, RemindersManager, CanvasAPI, CourseCatalog, AIJobQueue, AssignmentProcessor, ASSIGNMENT_COLUMNS
 
 load_dotenv()
 
 app = Flask(__name__, template_folder='.', static_folder='.')
 
 db_path = str(Path(__file__).parent / "studysync.db")
-db = Database(db_path=db_path)
+db = Database(db_path=db_path, storage_profile=os.getenv("DB_STORAGE_PROFILE", "wal"))
 ai_enhancer = None
 reminders_manager = RemindersManager()
 canvas_api = None
+canvas_api_config = None
+course_catalog = None
+ai_job_queue = None
 processor = None
 
-def initialize_components():
-    global ai_enhancer, canvas_api, processor
+def get_canvas_api():
+    global canvas_api, canvas_api_config, course_catalog
 
-    api_token = os.getenv("CANVAS_API_TOKEN")
-    canvas_domain = os.getenv("CANVAS_DOMAIN")
+    config = (os.getenv("CANVAS_API_TOKEN"), os.getenv("CANVAS_DOMAIN"))
+    if not all(config):
+        return None
 
-    if not api_token or not canvas_domain:
-        return False
+    # Reuse the client (and its pooled connections) until the credentials change.
+    if canvas_api is None or canvas_api_config != config:
+        if canvas_api is not None:
+            # Release the old client's pooled connections and worker threads.
+            canvas_api.close()
+        canvas_api = CanvasAPI(*config, cache=db)
+        canvas_api_config = config
+        course_catalog = CourseCatalog(db, canvas_api)
+    return canvas_api
+
+def get_course_catalog():
+    return course_catalog if get_canvas_api() else None
 
-    canvas_api = CanvasAPI(api_token, canvas_domain)
+def initialize_components():
+    global ai_enhancer, ai_job_queue, processor
+
+    if not get_canvas_api():
+        return False
 
     ollama_model = os.getenv("OLLAMA_MODEL")
     if not ollama_model:
         print("ERROR: OLLAMA_MODEL not set in .env file. AI features will be disabled.")
         return False
 
-    ai_enhancer = AIEnhancer(ollama_model=ollama_model)
-    processor = AssignmentProcessor(db, ai_enhancer, reminders_manager)
+    # Keep one enhancer for the life of the server so its probe, timings and warm model carry over.
+    if ai_enhancer is None or ai_enhancer.ollama_model != ollama_model:
+        ai_enhancer = AIEnhancer(ollama_model=ollama_model, cache=db)
+        ai_enhancer.start_warm_up()
+        ai_job_queue = AIJobQueue(db, ai_enhancer)
+        processor = AssignmentProcessor(db, ai_enhancer, reminders_manager)
+    else:
+        ai_enhancer.reconnect()
     return True
 
+def resume_ai_jobs():
+    # Jobs whose lease ran out with a stopped process go back in line, then drain in the background.
+    # Initializing here also starts the model loading at startup rather than mid-sync.
+    db.reset_running_ai_jobs()
+    if initialize_components() and ai_enhancer.model and db.count_pending_ai_jobs():
+        ai_job_queue.start_background()
+
 def get_due_date(item):
     due_at = item.get("due_at")
     if not due_at and "assignment" in item:
@@ -57,6 +88,43 @@ def get_due_date(item):
             due_at = assignment["checkpoints"][0].get("due_at")
     return due_at or ""
 
+def encode_page_cursor(after):
+    if after is None:
+        return None
+    return base64.urlsafe_b64encode(json.dumps(list(after)).encode('utf-8')).decode('ascii')
+
+def decode_page_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        due_at, assignment_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return str(due_at), str(assignment_id)
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+def parse_assignment_fields(value):
+    if not value:
+        return ASSIGNMENT_COLUMNS
+    fields = tuple(f.strip() for f in value.split(',') if f.strip())
+    unknown_fields = [f for f in fields if f not in ASSIGNMENT_COLUMNS]
+    if unknown_fields:
+        raise ValueError(f'Unknown fields: {", ".join(unknown_fields)}')
+    return fields
+
+def versioned_etag(*parts):
+    key = '|'.join(str(part) for part in (request.path, request.query_string.decode('utf-8')) + parts)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+def not_modified(etag):
+    if request.if_none_match.contains(etag):
+        return etag_response(Response(status=304), etag)
+    return None
+
+def etag_response(response, etag):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -72,35 +140,87 @@ def app_js():
 @app.route('/api/assignments')
 def get_assignments():
     try:
+        data_version = db.get_data_version()
+        etag = versioned_etag(data_version)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
         include_deleted = request.args.get('include_deleted', 'false').lower() == 'true'
-        assignments = db.get_all_assignments(include_deleted=include_deleted)
-        result = []
-        for assignment in assignments:
-            result.append({
-                'assignment_id': assignment[0],
-                'title': assignment[1],
-                'description': assignment[2],
-                'due_at': assignment[3],
-                'course_name': assignment[4],
-                'reminder_list': assignment[5],
-                'ai_notes': assignment[6] if len(assignment) > 6 else None,
-                'reminder_added': assignment[7] if len(assignment) > 7 else 0,
-                'status': assignment[8] if len(assignment) > 8 else 'Not Started',
-                'priority': assignment[9] if len(assignment) > 9 else 'Medium',
-                'user_notes': assignment[10] if len(assignment) > 10 else '',
-                'deleted': assignment[11] if len(assignment) > 11 else 0,
-                'time_estimate': assignment[12] if len(assignment) > 12 else None,
-                'suggested_priority': assignment[13] if len(assignment) > 13 else None,
-                'ai_confidence': assignment[14] if len(assignment) > 14 else None,
-                'ai_confidence_explanation': assignment[15] if len(assignment) > 15 else None
-            })
-        return jsonify(result)
+        deleted_filter = request.args.get('deleted', 'all' if include_deleted else 'false').lower()
+        if deleted_filter not in ('true', 'false', 'all'):
+            return jsonify({'error': 'deleted must be true, false or all'}), 400
+
+        try:
+            fields = parse_assignment_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        limit = request.args.get('limit', type=int)
+        if limit is not None and limit < 1:
+            return jsonify({'error': 'limit must be a positive integer'}), 400
+
+        try:
+            after = decode_page_cursor(request.args.get('cursor'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        assignments, next_after = db.get_assignments_page(
+            limit=min(limit, 500) if limit is not None else None,
+            after=after,
+            course_name=request.args.get('course'),
+            status=request.args.get('status'),
+            priority=request.args.get('priority'),
+            deleted=None if deleted_filter == 'all' else deleted_filter == 'true',
+            fields=fields
+        )
+        result = [assignment.to_dict(fields) for assignment in assignments]
+
+        if limit is None:
+            response = jsonify(result)
+        else:
+            response = jsonify({'assignments': result, 'next_cursor': encode_page_cursor(next_after)})
+        response.headers['X-Data-Version'] = str(data_version)
+        return etag_response(response, etag)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/assignments/changes')
+def get_assignment_changes():
+    try:
+        since = request.args.get('since', type=int)
+        if since is None or since < 0:
+            return jsonify({'error': 'since must be a non-negative integer'}), 400
+
+        try:
+            fields = parse_assignment_fields(request.args.get('fields'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        # Clients match upserts to their local rows by id, whatever fields they asked for.
+        fields = tuple(dict.fromkeys(('assignment_id',) + fields))
+
+        etag = versioned_etag(db.get_data_version())
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
+        version, upserted, deleted = db.get_changes_since(since, fields=fields)
+        return etag_response(jsonify({
+            'version': version,
+            'upserted': [assignment.to_dict(fields) for assignment in upserted],
+            'deleted': deleted
+        }), etag)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/assignments/deleted')
 def get_deleted_assignments():
     try:
+        etag = versioned_etag(db.get_data_version())
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
         deleted = db.get_deleted_assignments()
         result = []
         for item in deleted:
@@ -110,7 +230,7 @@ def get_deleted_assignments():
                 'course_name': item[2],
                 'deleted_at': item[3]
             })
-        return jsonify(result)
+        return etag_response(jsonify(result), etag)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -156,59 +276,37 @@ def permanently_delete_assignment():
 @app.route('/api/courses')
 def get_courses():
     try:
-        db_courses = db.get_all_courses_from_db()
-        db_course_names = {c['name']: c for c in db_courses}
+        courses = None
 
-        result = []
-
-        api_token = os.getenv("CANVAS_API_TOKEN")
-        canvas_domain = os.getenv("CANVAS_DOMAIN")
-        if api_token and canvas_domain:
+        catalog = get_course_catalog()
+        if catalog:
             try:
-                headers = {"Authorization": f"Bearer {api_token}"}
-                base_url = f"https://{canvas_domain}/api/v1"
-
-                response = requests.get(f"{base_url}/users/self/favorites/courses", headers=headers)
-                response.raise_for_status()
-                canvas_courses = response.json()
-
-                for course in canvas_courses:
-                    course_name = course.get("name", "Unnamed Course")
-                    db_course = db_course_names.get(course_name)
-
-                    if db_course:
-                        reminder_list = db_course['reminder_list']
-                        enabled = db_course['enabled']
-                    else:
-                        reminder_list, enabled = db.get_course_mapping_with_enabled(course_name)
-                        if reminder_list is None:
-                            reminder_list = ''
-                            enabled = True
-
-                    result.append({
-                        'id': course.get('id'),
-                        'name': course_name,
-                        'reminder_list': reminder_list or '',
-                        'enabled': enabled if enabled is not None else True
-                    })
+                courses = catalog.get_courses()
             except Exception as e:
-                pass
+                print(f"Error loading courses from Canvas, falling back to local courses: {e}")
 
-        for db_course in db_courses:
-            if not any(c.get('name') == db_course['name'] for c in result):
-                result.append({
-                    'id': None,
-                    'name': db_course['name'],
-                    'reminder_list': db_course['reminder_list'] or '',
-                    'enabled': db_course['enabled']
-                })
+        if courses is None:
+            courses = [dict(c, id=None) for c in db.get_all_courses_from_db()]
 
-        return jsonify(result)
+        result = [{
+            'id': course['id'],
+            'name': course['name'],
+            'reminder_list': course['reminder_list'],
+            'enabled': course['enabled'] if course['enabled'] is not None else True
+        } for course in courses]
+
+        etag = versioned_etag(json.dumps(result, sort_keys=True))
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        return etag_response(jsonify(result), etag)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/sync', methods=['GET'])
 def sync_assignments():
+    full_sync = request.args.get('full') == '1'
+
     def generate():
         try:
             if not initialize_components():
@@ -229,60 +327,40 @@ def sync_assignments():
 
             now = datetime.now(EST)
 
-            api_token = os.getenv("CANVAS_API_TOKEN")
-            canvas_domain = os.getenv("CANVAS_DOMAIN")
-            headers = {"Authorization": f"Bearer {api_token}"}
-            base_url = f"https://{canvas_domain}/api/v1"
-
-            response = requests.get(f"{base_url}/users/self/favorites/courses", headers=headers)
-            response.raise_for_status()
-            favorite_courses = response.json()
-
             total_added = 0
             added_by_course = {}
 
-            enabled_courses = []
-            for course in favorite_courses:
-                course_id = course.get("id")
-                course_name = course.get("name", "Unnamed Course")
-
-                if not course_id:
-                    continue
-
-                reminder_list, enabled = db.get_course_mapping_with_enabled(course_name)
-                if enabled == 0:
-                    continue
-
-                if not reminder_list or reminder_list.strip() == '':
-                    continue
+            enabled_courses = get_course_catalog().get_sync_courses()
 
-                enabled_courses.append({
-                    'id': course_id,
-                    'name': course_name,
-                    'reminder_list': reminder_list
-                })
+            # Incremental syncs only ask Canvas for upcoming assignments and
+            # skip anything older than the course's stored watermarks.
+            bucket = None if full_sync else 'future'
 
             course_data = {}
-            with ThreadPoolExecutor(max_workers=min(5, len(enabled_courses))) as executor:
-                future_to_course = {
-                    executor.submit(canvas_api.get_course_items, course['id']): course
-                    for course in enabled_courses
-                }
-
-                for future in as_completed(future_to_course):
-                    course = future_to_course[future]
-                    try:
-                        items = future.result()
-                        course_data[course['id']] = {
-                            'course': course,
-                            'items': items
-                        }
-                    except Exception as e:
-                        print(f"Error fetching course {course['name']}: {e}")
-                        course_data[course['id']] = {
-                            'course': course,
-                            'items': []
-                        }
+            failed_courses = []
+            course_items = canvas_api.get_courses_items([course['id'] for course in enabled_courses], bucket)
+
+            for course in enabled_courses:
+                try:
+                    items = course_items[course['id']]
+                    if isinstance(items, Exception):
+                        raise items
+
+                    watermarks = None if full_sync else db.get_sync_watermarks(course['id'])
+                    items, watermarks = processor.filter_changed_items(items, watermarks)
+                    course_data[course['id']] = {
+                        'course': course,
+                        'items': items,
+                        'watermarks': watermarks
+                    }
+                except Exception as e:
+                    print(f"Error fetching course {course['name']}: {e}")
+                    failed_courses.append({'name': course['name'], 'error': str(e)})
+                    course_data[course['id']] = {
+                        'course': course,
+                        'items': [],
+                        'watermarks': {}
+                    }
 
             all_assignments_to_process = []
 
@@ -304,19 +382,20 @@ def sync_assignments():
                         needs_ai = (ai_summary_enabled and
                                    ai_enhancer and
                                    ai_enhancer.model and
-                                   (not existing or not existing[7] or not existing[7].strip()))
+                                   (not existing or not existing.ai_notes or not existing.ai_notes.strip()))
 
                         all_assignments_to_process.append({
                             'assignment_data': assignment_data,
                             'course_name': course_name,
                             'reminder_list': reminder_list,
+                            'priority': existing.priority if existing else None,
                             'needs_ai': needs_ai
                         })
 
             total_assignments_for_reminders = len(all_assignments_to_process)
             assignments_needing_ai = [a for a in all_assignments_to_process if a['needs_ai']] if all_assignments_to_process else []
 
-            total_ai_time = len(assignments_needing_ai) * 3.5 if assignments_needing_ai else 0
+            total_ai_time = ai_enhancer.estimate_batch_time(len(assignments_needing_ai)) if assignments_needing_ai and ai_enhancer else 0
             total_reminder_time = total_assignments_for_reminders * 1.5 if auto_sync_enabled else 0
             total_estimated_time = total_ai_time + total_reminder_time
 
@@ -331,67 +410,49 @@ def sync_assignments():
                     phase_start_time = time.time()
                     yield f"data: {json.dumps({'type': 'progress', 'message': 'Generating AI summaries...', 'progress': 0})}\n\n"
 
-                    def process_ai_assignment(assignment_info):
-                        try:
-                            assignment_data = assignment_info['assignment_data']
-                            course_name = assignment_info['course_name']
-                            reminder_list = assignment_info['reminder_list']
-
-                            title = assignment_data["title"]
-                            description = assignment_data.get("description", "")
-
-                            ai_notes, time_estimate, suggested_priority, ai_confidence, ai_confidence_explanation = ai_enhancer.enhance_assignment(
-                                title, description, course_name, college_name
-                            )
-
-                            return {
-                                'assignment_data': assignment_data,
-                                'course_name': course_name,
-                                'reminder_list': reminder_list,
-                                'ai_notes': ai_notes,
-                                'time_estimate': time_estimate,
-                                'suggested_priority': suggested_priority,
-                                'ai_confidence': ai_confidence,
-                                'ai_confidence_explanation': ai_confidence_explanation
-                            }
-                        except Exception as e:
-                            print(f"Error processing AI for assignment {assignment_info['assignment_data']['title']}: {e}")
-                            return {
-                                'assignment_data': assignment_info['assignment_data'],
-                                'course_name': assignment_info['course_name'],
-                                'reminder_list': assignment_info['reminder_list'],
-                                'ai_notes': "",
-                                'time_estimate': None,
-                                'suggested_priority': None,
-                                'ai_confidence': None,
-                                'ai_confidence_explanation': None
-                            }
-
-                    with ThreadPoolExecutor(max_workers=1) as executor:
-                        future_to_assignment = {
-                            executor.submit(process_ai_assignment, assignment_info): assignment_info
-                            for assignment_info in assignments_needing_ai
-                        }
-
-                        completed = 0
-                        for future in as_completed(future_to_assignment):
-                            assignment_info = future_to_assignment[future]
-                            try:
-                                result = future.result()
-                                assignment_id = result['assignment_data']['assignment_id']
-                                ai_results[assignment_id] = result
-
-                                completed += 1
+                    # A background drain would otherwise claim some of this sync's jobs and
+                    # report them where the loop below never sees them; this drain takes over.
+                    ai_job_queue.stop_background()
+                    ai_job_queue.enqueue([{
+                        'assignment_id': assignment_info['assignment_data']['assignment_id'],
+                        'title': assignment_info['assignment_data']['title'],
+                        'description': assignment_info['assignment_data'].get('description', ''),
+                        'course_name': assignment_info['course_name'],
+                        'college_name': college_name,
+                        'due_at': assignment_info['assignment_data']['due_at'],
+                        'priority': assignment_info['priority']
+                    } for assignment_info in assignments_needing_ai])
+
+                    titles = {a['assignment_data']['assignment_id']: a['assignment_data']['title'] for a in assignments_needing_ai}
+                    partial = {}
+                    finished = set()
+                    for event in ai_job_queue.drain():
+                        assignment_id = event['key']
+                        ai_partial = None
+
+                        # Leftover jobs from an earlier sync or the stopped background drain run
+                        # here too, but only this sync's count toward progress.
+                        if assignment_id not in titles:
+                            continue
 
-                                if total_estimated_time > 0:
-                                    ai_progress = (completed / len(assignments_needing_ai)) * (total_ai_time / total_estimated_time * 100)
-                                    progress = int(ai_progress)
-                                else:
-                                    progress = int((completed / len(assignments_needing_ai)) * 100) if len(assignments_needing_ai) > 0 else 0
+                        if event['type'] == 'done':
+                            if event['result']['ai_notes'] or assignment_id not in ai_results:
+                                ai_results[assignment_id] = event['result']
+                            partial.pop(assignment_id, None)
+                            finished.add(assignment_id)
+                        else:
+                            # Count streamed fields as a fraction of the assignment they belong to.
+                            partial[assignment_id] = event['fields'] / event['total']
+                            ai_partial = {'title': titles[assignment_id], 'fields': event['fields'], 'total': event['total']}
+
+                        done = len(finished) + sum(partial.values())
+                        if total_estimated_time > 0:
+                            ai_progress = (done / len(assignments_needing_ai)) * (total_ai_time / total_estimated_time * 100)
+                            progress = int(ai_progress)
+                        else:
+                            progress = int((done / len(assignments_needing_ai)) * 100) if len(assignments_needing_ai) > 0 else 0
 
-                                yield f"data: {json.dumps({'type': 'progress', 'message': 'Generating AI summaries...', 'progress': progress})}\n\n"
-                            except Exception as e:
-                                print(f"Error in AI processing: {e}")
+                        yield f"data: {json.dumps({'type': 'progress', 'message': 'Generating AI summaries...', 'progress': progress, 'ai_partial': ai_partial})}\n\n"
                 elif (not assignments_needing_ai or not ai_summary_enabled) and auto_sync_enabled and total_assignments_for_reminders > 0:
                     phase_start_time = time.time()
                     yield f"data: {json.dumps({'type': 'progress', 'message': 'Adding reminders...', 'progress': 0})}\n\n"
@@ -415,119 +476,86 @@ def sync_assignments():
 
                 new_assignments = 0
                 new_items = []
+                pending_rows = []
+                pending_assignment_data = {}
 
                 for item in items:
                     should_process, assignment_data = processor.should_process_assignment(item, now)
                     if should_process:
                         assignment_id = assignment_data['assignment_id']
 
-                        if db.is_assignment_permanently_deleted(assignment_id):
-                            continue
-
                         existing = db.get_assignment(assignment_id)
-                        if existing and existing[14] == 1:
+                        if existing and existing.deleted == 1:
                             continue
 
-                        new_assignments += 1
-                        new_items.append((assignment_data["title"], assignment_data["display_due"]))
-
-                        if assignment_id in ai_results:
-                            ai_result = ai_results[assignment_id]
-                            ai_notes = ai_result['ai_notes']
-                            time_estimate = ai_result['time_estimate']
-                            suggested_priority = ai_result['suggested_priority']
-                            ai_confidence = ai_result['ai_confidence']
-                            ai_confidence_explanation = ai_result['ai_confidence_explanation']
-
-                            db.save_assignment(assignment_id, assignment_data['title'],
-                                             assignment_data.get('description', ''),
-                                             assignment_data['due_at'],
-                                             course_name, reminder_list, ai_notes)
-
-                            update_fields = {}
-                            if time_estimate is not None:
-                                update_fields['time_estimate'] = time_estimate
-                            if suggested_priority is not None:
-                                update_fields['suggested_priority'] = suggested_priority
-                            if ai_confidence is not None:
-                                update_fields['ai_confidence'] = ai_confidence
-                            if ai_confidence_explanation is not None:
-                                update_fields['ai_confidence_explanation'] = ai_confidence_explanation
-                            if update_fields:
-                                db.update_assignment_fields(assignment_id, **update_fields)
-                        else:
-                            processor.process_assignment(assignment_data, reminder_list, course_name, college_name, ai_summary_enabled)
-
-                        assignment = db.get_assignment(assignment_id)
-                        if assignment:
-                            assignment_dict = {
-                                'assignment_id': assignment[1],
-                                'title': assignment[2],
-                                'description': assignment[3],
-                                'due_at': assignment[4],
-                                'course_name': assignment[5],
-                                'reminder_list': assignment[6],
-                                'ai_notes': assignment[7] if len(assignment) > 7 else None,
-                                'reminder_added': assignment[8] if len(assignment) > 8 else 0,
-                                'status': assignment[11] if len(assignment) > 11 else 'Not Started',
-                                'priority': assignment[12] if len(assignment) > 12 else 'Medium',
-                                'user_notes': assignment[13] if len(assignment) > 13 else '',
-                                'deleted': assignment[14] if len(assignment) > 14 else 0,
-                                'time_estimate': assignment[16] if len(assignment) > 16 else None,
-                                'suggested_priority': assignment[17] if len(assignment) > 17 else None,
-                                'ai_confidence': assignment[18] if len(assignment) > 18 else None,
-                                'ai_confidence_explanation': assignment[19] if len(assignment) > 19 else None
-                            }
-
-                            if phase_start_time is not None:
-                                if auto_sync_enabled:
-                                    if reminder_phase_start_time is None:
-                                        reminder_phase_start_time = time.time()
-
-                                    reminders_added += 1
-
-                                    if total_estimated_time > 0:
-                                        ai_progress = (total_ai_time / total_estimated_time * 100) if total_ai_time > 0 else 0
-                                        reminder_progress = (reminders_added / total_assignments_for_reminders) * (total_reminder_time / total_estimated_time * 100) if total_reminder_time > 0 and total_assignments_for_reminders > 0 else 0
-                                        progress = int(ai_progress + reminder_progress)
-                                    else:
-                                        reminder_progress = (reminders_added / total_assignments_for_reminders) * 100 if total_assignments_for_reminders > 0 else 0
-                                        progress = int(reminder_progress)
-
-                                    yield f"data: {json.dumps({'type': 'progress', 'message': 'Adding reminders...', 'progress': progress, 'assignment': assignment_dict})}\n\n"
-                                else:
-                                    if total_estimated_time > 0:
-                                        ai_progress = (total_ai_time / total_estimated_time * 100) if total_ai_time > 0 else 0
-                                    else:
-                                        ai_progress = 100 if len(assignments_needing_ai) > 0 and ai_summary_enabled else 0
-                                    yield f"data: {json.dumps({'type': 'progress', 'message': 'Processing assignments...', 'progress': ai_progress, 'assignment': assignment_dict})}\n\n"
+                        pending_rows.append(processor.build_assignment_row(
+                            assignment_data, reminder_list, course_name, college_name, ai_summary_enabled,
+                            ai_result=ai_results.get(assignment_id)
+                        ))
+                        pending_assignment_data[assignment_id] = assignment_data
+
+                saved_ids = db.save_assignments_bulk(pending_rows)
+                db.set_sync_watermarks(course_id, data['watermarks'])
 
+                for assignment_id in saved_ids:
+                    assignment_data = pending_assignment_data[assignment_id]
+                    new_assignments += 1
+                    new_items.append((assignment_data["title"], assignment_data["display_due"]))
+
+                    assignment = db.get_assignment(assignment_id)
+                    if assignment:
+                        assignment_dict = assignment.to_dict()
+
+                        if phase_start_time is not None:
                             if auto_sync_enabled:
-                                try:
-                                    due_at = assignment[4]
-                                    title = assignment[2]
-                                    reminder_list_name = assignment[6]
-                                    ai_notes = assignment[7] if len(assignment) > 7 else ""
+                                if reminder_phase_start_time is None:
+                                    reminder_phase_start_time = time.time()
 
-                                    due_date_utc = datetime.strptime(due_at, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=ZoneInfo("UTC"))
-                                    local_due = due_date_utc.astimezone(EST)
-                                    apple_due = local_due.strftime("%A, %B %d, %Y at %I:%M:%S %p")
+                                reminders_added += 1
 
-                                    reminders_manager.add_reminder(title, apple_due, reminder_list_name, ai_notes or "")
-                                    db.mark_reminder_added(assignment_dict['assignment_id'])
-                                except Exception as e:
-                                    print(f"Error adding reminder for {title}: {e}")
+                                if total_estimated_time > 0:
+                                    ai_progress = (total_ai_time / total_estimated_time * 100) if total_ai_time > 0 else 0
+                                    reminder_progress = (reminders_added / total_assignments_for_reminders) * (total_reminder_time / total_estimated_time * 100) if total_reminder_time > 0 and total_assignments_for_reminders > 0 else 0
+                                    progress = int(ai_progress + reminder_progress)
+                                else:
+                                    reminder_progress = (reminders_added / total_assignments_for_reminders) * 100 if total_assignments_for_reminders > 0 else 0
+                                    progress = int(reminder_progress)
+
+                                yield f"data: {json.dumps({'type': 'progress', 'message': 'Adding reminders...', 'progress': progress, 'assignment': assignment_dict})}\n\n"
+                            else:
+                                if total_estimated_time > 0:
+                                    ai_progress = (total_ai_time / total_estimated_time * 100) if total_ai_time > 0 else 0
+                                else:
+                                    ai_progress = 100 if len(assignments_needing_ai) > 0 and ai_summary_enabled else 0
+                                yield f"data: {json.dumps({'type': 'progress', 'message': 'Processing assignments...', 'progress': ai_progress, 'assignment': assignment_dict})}\n\n"
+
+                        if auto_sync_enabled:
+                            try:
+                                due_at = assignment.due_at
+                                title = assignment.title
+                                reminder_list_name = assignment.reminder_list
+                                ai_notes = assignment.ai_notes
+
+                                due_date_utc = datetime.strptime(due_at, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=ZoneInfo("UTC"))
+                                local_due = due_date_utc.astimezone(EST)
+                                apple_due = local_due.strftime("%A, %B %d, %Y at %I:%M:%S %p")
+
+                                reminders_manager.add_reminder(title, apple_due, reminder_list_name, ai_notes or "")
+                                db.mark_reminder_added(assignment.assignment_id)
+                            except Exception as e:
+                                print(f"Error adding reminder for {title}: {e}")
 
                 if new_assignments > 0:
                     added_by_course[course_name] = new_items
                     total_added += new_assignments
 
             db.set_last_sync_timestamp(datetime.now(EST).isoformat())
+            db.checkpoint()
 
             if phase_start_time is not None:
                 yield f"data: {json.dumps({'type': 'progress', 'message': 'Finishing up...', 'progress': 100})}\n\n"
 
-            yield f"data: {json.dumps({'type': 'complete', 'total_added': total_added, 'added_by_course': added_by_course, 'progress': 100})}\n\n"
+            yield f"data: {json.dumps({'type': 'complete', 'total_added': total_added, 'added_by_course': added_by_course, 'failed_courses': failed_courses, 'progress': 100})}\n\n"
         except Exception as e:
             yield f"data: {json.dumps({'type': 'error', 'error': str(e)})}\n\n"
 
@@ -536,15 +564,20 @@ def sync_assignments():
 @app.route('/api/settings', methods=['GET', 'POST'])
 def settings():
     if request.method == 'GET':
+        etag = versioned_etag(db.get_data_version())
+        cached = not_modified(etag)
+        if cached:
+            return cached
+
         college_name = db.get_setting("college_name")
         auto_sync_reminders = db.get_setting("auto_sync_reminders") or '0'
         ai_summary_enabled = db.get_setting("ai_summary_enabled")
 
-        return jsonify({
+        return etag_response(jsonify({
             'college_name': college_name,
             'auto_sync_reminders': auto_sync_reminders,
             'ai_summary_enabled': ai_summary_enabled
-        })
+        }), etag)
     else:
         data = request.json
         college_name = data.get('college_name', '')
@@ -635,15 +668,15 @@ def add_reminder_to_assignment():
         if not assignment:
             all_assignments = db.get_all_assignments(include_deleted=False)
 
-            assignment_ids = [a[0] for a in all_assignments if len(a) > 0]
+            assignment_ids = [a.assignment_id for a in all_assignments]
             return jsonify({
                 'error': f'Assignment not found. Searched ID: "{assignment_id}" (type: {type(assignment_id).__name__}). Found {len(assignment_ids)} assignments. First few IDs: {assignment_ids[:5]}'
             }), 404
 
-        title = assignment[2]
-        due_at = assignment[4]
-        reminder_list = assignment[6]
-        ai_notes = assignment[7] if len(assignment) > 7 else ""
+        title = assignment.title
+        due_at = assignment.due_at
+        reminder_list = assignment.reminder_list
+        ai_notes = assignment.ai_notes
 
         try:
             due_date_utc = None
@@ -697,8 +730,8 @@ def remove_reminder_from_assignment():
         if not assignment:
             return jsonify({'error': 'Assignment not found'}), 404
 
-        title = assignment[2]
-        reminder_list = assignment[6]
+        title = assignment.title
+        reminder_list = assignment.reminder_list
 
         reminders_manager.remove_existing_reminder(title, reminder_list)
 
@@ -723,13 +756,13 @@ def generate_ai_summary_for_assignment():
         if not assignment:
             return jsonify({'error': 'Assignment not found'}), 404
 
-        existing_ai_notes = assignment[7] if len(assignment) > 7 else None
+        existing_ai_notes = assignment.ai_notes
         if existing_ai_notes and existing_ai_notes.strip():
             return jsonify({'error': 'AI summary already exists for this assignment'}), 400
 
-        title = assignment[2]
-        description = assignment[3] if len(assignment) > 3 else ''
-        course_name = assignment[5] if len(assignment) > 5 else ''
+        title = assignment.title
+        description = assignment.description or ''
+        course_name = assignment.course_name or ''
         college_name = db.get_setting('college_name') or ''
 
         global ai_enhancer
@@ -846,20 +879,19 @@ def create_assignment():
                     title, description or "", course_name, college_name
                 )
 
-        db.save_assignment(assignment_id, title, description, due_at, course_name, reminder_list, ai_notes)
-
-        if time_estimate is not None or suggested_priority is not None or ai_confidence is not None or ai_confidence_explanation is not None:
-            update_fields = {}
-            if time_estimate is not None:
-                update_fields['time_estimate'] = time_estimate
-            if suggested_priority is not None:
-                update_fields['suggested_priority'] = suggested_priority
-            if ai_confidence is not None:
-                update_fields['ai_confidence'] = ai_confidence
-            if ai_confidence_explanation is not None:
-                update_fields['ai_confidence_explanation'] = ai_confidence_explanation
-            if update_fields:
-                db.update_assignment_fields(assignment_id, **update_fields)
+        db.save_assignments_bulk([{
+            'assignment_id': assignment_id,
+            'title': title,
+            'description': description,
+            'due_at': due_at,
+            'course_name': course_name,
+            'reminder_list': reminder_list,
+            'ai_notes': ai_notes,
+            'time_estimate': time_estimate,
+            'suggested_priority': suggested_priority,
+            'ai_confidence': ai_confidence,
+            'ai_confidence_explanation': ai_confidence_explanation
+        }])
 
         if user_notes:
             db.update_assignment_fields(assignment_id, user_notes=user_notes)
@@ -868,6 +900,15 @@ def create_assignment():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/ai-status', methods=['GET'])
+def get_ai_status():
+    try:
+        if not initialize_components():
+            return jsonify({'available': False, 'error': 'AI is not configured'})
+        return jsonify(ai_enhancer.status())
+    except Exception as e:
+        return jsonify({'available': False, 'error': str(e)}), 500
+
 @app.route('/api/ai-insights/check', methods=['GET'])
 def check_ai_insights():
     try:
@@ -954,7 +995,7 @@ def get_ai_insights():
 
         active_assignments = []
         for assignment in assignments:
-            due_at = assignment[3]
+            due_at = assignment.due_at
             try:
                 due_date_obj = datetime.strptime(due_at, "%Y-%m-%dT%H:%M:%SZ")
                 if due_date_obj.date() > end_date_obj.date():
@@ -962,28 +1003,15 @@ def get_ai_insights():
             except (ValueError, TypeError):
                 pass
 
-            time_estimate_raw = assignment[12] if len(assignment) > 12 else None
             try:
-                time_estimate = float(time_estimate_raw) if time_estimate_raw is not None else None
+                time_estimate = float(assignment.time_estimate) if assignment.time_estimate is not None else None
             except (ValueError, TypeError):
                 time_estimate = None
 
-            active_assignments.append({
-                'assignment_id': assignment[0],
-                'title': assignment[1],
-                'description': assignment[2] if len(assignment) > 2 else '',
-                'due_at': assignment[3],
-                'course_name': assignment[4],
-                'reminder_list': assignment[5],
-                'ai_notes': assignment[6] if len(assignment) > 6 else None,
-                'reminder_added': assignment[7] if len(assignment) > 7 else 0,
-                'status': assignment[8] if len(assignment) > 8 else 'Not Started',
-                'priority': assignment[9] if len(assignment) > 9 else 'Medium',
-                'user_notes': assignment[10] if len(assignment) > 10 else '',
-                'time_estimate': time_estimate,
-                'suggested_priority': assignment[13] if len(assignment) > 13 else None,
-                'ai_confidence': assignment[14] if len(assignment) > 14 else None
-            })
+            active_assignment = assignment.to_dict()
+            active_assignment['description'] = assignment.description or ''
+            active_assignment['time_estimate'] = time_estimate
+            active_assignments.append(active_assignment)
 
         if not active_assignments:
             return jsonify({'error': 'No active assignments to analyze within the selected date range'}), 400
@@ -1010,4 +1038,7 @@ def get_ai_insights():
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
+    # Under the debug reloader only the serving child should pick the queue back up.
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        resume_ai_jobs()
     app.run(debug=True, port=5001)
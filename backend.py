@@ -1,446 +1,735 @@
 """
 Backend modules for StudySync AI.
-Contains Database, AIEnhancer, RemindersManager, CanvasAPI, and AssignmentProcessor classes.
+Contains Database, Assignment, AIEnhancer, RemindersManager, CanvasRateLimiter, CanvasAPI, CourseCatalog, AIJobQueue, and AssignmentProcessor classes.
 """
 
+import os
 import re
-import html
 import json
+import hashlib
+import time
+import queue
+import random
+import atexit
+import asyncio
 import sqlite3
+import threading
 import subprocess
 import requests
-from datetime import datetime
+from requests.adapters import HTTPAdapter
+from html.parser import HTMLParser
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 EST = ZoneInfo("America/New_York")
 from pathlib import Path
 from dotenv import load_dotenv
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+STORAGE_PROFILES = {
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 128 * 1024 * 1024,
+        "busy_timeout": 5000,
+        "wal_autocheckpoint": 1000,
+    },
+    "rollback": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "busy_timeout": 5000,
+        "wal_autocheckpoint": 1000,
+    },
+}
+
+ASSIGNMENT_COLUMNS = (
+    'assignment_id', 'title', 'description', 'due_at', 'course_name', 'reminder_list', 'ai_notes',
+    'reminder_added', 'status', 'priority', 'user_notes', 'deleted', 'time_estimate',
+    'suggested_priority', 'ai_confidence', 'ai_confidence_explanation'
+)
+ASSIGNMENT_SELECT = ', '.join(ASSIGNMENT_COLUMNS)
+
+# A running AI job not finished within this many seconds is assumed abandoned.
+AI_JOB_LEASE_SECONDS = 600
+
+PRIORITY_RANKS = {'High': 0, 'Medium': 1, 'Low': 2}
+
+AI_RESULT_FIELDS = ('ai_notes', 'time_estimate', 'suggested_priority', 'ai_confidence', 'ai_confidence_explanation')
+
+ASSIGNMENT_RESPONSE_FIELDS = ('Time', 'Priority', 'Difficulty', 'Notes', 'Confidence', 'ConfidenceReason')
+ASSIGNMENT_FIELD_LINE = re.compile(r'^(' + '|'.join(ASSIGNMENT_RESPONSE_FIELDS) + r'):[ \t]*\S[^\n]*\n', re.MULTILINE)
+
+class Assignment:
+    __slots__ = ASSIGNMENT_COLUMNS
+
+    def __init__(self, *values):
+        for column, value in zip(ASSIGNMENT_COLUMNS, values):
+            setattr(self, column, value)
+
+    @classmethod
+    def row_factory(cls, cursor, row):
+        return cls(*row)
+
+    @classmethod
+    def from_columns(cls, columns, row):
+        assignment = cls.__new__(cls)
+        for column, value in zip(columns, row):
+            setattr(assignment, column, value)
+        return assignment
+
+    def to_dict(self, fields=ASSIGNMENT_COLUMNS):
+        return {field: getattr(self, field) for field in fields}
+
+def _add_missing_columns(cursor, table, columns):
+    cursor.execute(f'PRAGMA table_info({table})')
+    existing_columns = {row[1] for row in cursor.fetchall()}
+    for column_name, column_def in columns:
+        if column_name not in existing_columns:
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column_name} {column_def}')
+
+def _migrate_base_schema(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS assignments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            assignment_id TEXT UNIQUE NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT,
+            due_at TEXT NOT NULL,
+            course_name TEXT NOT NULL,
+            reminder_list TEXT NOT NULL,
+            ai_notes TEXT,
+            reminder_added INTEGER DEFAULT 0,
+            status TEXT DEFAULT "Not Started",
+            priority TEXT DEFAULT "Medium",
+            user_notes TEXT DEFAULT "",
+            deleted INTEGER DEFAULT 0,
+            deleted_at TIMESTAMP DEFAULT NULL,
+            time_estimate REAL DEFAULT NULL,
+            suggested_priority TEXT DEFAULT NULL,
+            ai_confidence INTEGER DEFAULT NULL,
+            ai_confidence_explanation TEXT DEFAULT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS deleted_assignments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            assignment_id TEXT UNIQUE NOT NULL,
+            title TEXT NOT NULL,
+            course_name TEXT NOT NULL,
+            deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS courses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            course_name TEXT UNIQUE NOT NULL,
+            reminder_list TEXT NOT NULL,
+            enabled INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS settings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            key TEXT UNIQUE NOT NULL,
+            value TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ai_insights (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            insights_json TEXT NOT NULL,
+            generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_sync_before TIMESTAMP,
+            end_date TEXT
+        )
+    ''')
+
+    _add_missing_columns(cursor, 'assignments', [
+        ('status', 'TEXT DEFAULT "Not Started"'),
+        ('priority', 'TEXT DEFAULT "Medium"'),
+        ('user_notes', 'TEXT DEFAULT ""'),
+        ('deleted', 'INTEGER DEFAULT 0'),
+        ('deleted_at', 'TIMESTAMP DEFAULT NULL'),
+        ('time_estimate', 'REAL DEFAULT NULL'),
+        ('suggested_priority', 'TEXT DEFAULT NULL'),
+        ('ai_confidence', 'INTEGER DEFAULT NULL'),
+        ('ai_confidence_explanation', 'TEXT DEFAULT NULL')
+    ])
+    _add_missing_columns(cursor, 'courses', [('enabled', 'INTEGER DEFAULT 1')])
+
+def _sync_indexes(indexes):
+    # Copied so a shipped step never changes; only idx_* indexes on its own tables are managed.
+    indexes = dict(indexes)
+    tables = sorted({definition.split(' ', 1)[0] for definition in indexes.values()})
+
+    def migrate(cursor):
+        cursor.execute(f'''
+            SELECT name FROM sqlite_master
+            WHERE type = 'index' AND name LIKE 'idx\\_%' ESCAPE '\\' AND tbl_name IN ({', '.join('?' * len(tables))})
+        ''', tables)
+        for (index_name,) in cursor.fetchall():
+            if index_name not in indexes:
+                cursor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+        for index_name, definition in indexes.items():
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {index_name} ON {definition}')
+    return migrate
+
+def _migrate_data_version(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    ''')
+    cursor.execute('INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 1)')
+
+def _migrate_row_versions(cursor):
+    _add_missing_columns(cursor, 'assignments', [('row_version', 'INTEGER NOT NULL DEFAULT 0')])
+    _add_missing_columns(cursor, 'deleted_assignments', [('row_version', 'INTEGER NOT NULL DEFAULT 0')])
+
+def _migrate_course_sync_state(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS course_sync_state (
+            course_id TEXT NOT NULL,
+            item_type TEXT NOT NULL,
+            watermark TEXT NOT NULL,
+            synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (course_id, item_type)
+        )
+    ''')
+
+def _migrate_http_cache(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS http_cache (
+            cache_key TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            etag TEXT,
+            body TEXT NOT NULL,
+            next_url TEXT,
+            size INTEGER NOT NULL,
+            fetched_at REAL NOT NULL,
+            last_used_at REAL NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_http_cache_last_used ON http_cache (last_used_at)')
+
+def _migrate_ai_cache(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ai_cache (
+            cache_key TEXT PRIMARY KEY,
+            ai_notes TEXT NOT NULL,
+            time_estimate REAL,
+            suggested_priority TEXT,
+            ai_confidence INTEGER,
+            ai_confidence_explanation TEXT,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_ai_cache_last_used ON ai_cache (last_used_at)')
+
+def _migrate_ai_jobs(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS ai_jobs (
+            assignment_id TEXT PRIMARY KEY,
+            title TEXT NOT NULL,
+            description TEXT,
+            course_name TEXT,
+            college_name TEXT,
+            due_at TEXT,
+            priority_rank INTEGER NOT NULL DEFAULT 1,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            enqueued_at REAL NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_ai_jobs_status_due_priority ON ai_jobs (status, due_at, priority_rank)')
+
+def _migrate_insights_summary_cache(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS insights_summary_cache (
+            cache_key TEXT PRIMARY KEY,
+            summary_json TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_used_at REAL NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_insights_summary_cache_last_used ON insights_summary_cache (last_used_at)')
+
+def _migrate_ai_job_leases(cursor):
+    _add_missing_columns(cursor, 'ai_jobs', [('claimed_at', 'REAL')])
+
+def _backfill_row_versions(cursor):
+    cursor.execute('UPDATE data_version SET version = version + 1 WHERE id = 1')
+    cursor.execute('SELECT version FROM data_version WHERE id = 1')
+    version = cursor.fetchone()[0]
+    cursor.execute('UPDATE assignments SET row_version = ? WHERE row_version = 0', (version,))
+    cursor.execute('UPDATE deleted_assignments SET row_version = ? WHERE row_version = 0', (version,))
+
+# Each entry upgrades the schema by one PRAGMA user_version step. Append new
+# steps to the end; never edit or reorder steps that have already shipped.
+SCHEMA_MIGRATIONS = [
+    _migrate_base_schema,
+    _sync_indexes({
+        "idx_assignments_deleted_due": "assignments (deleted, due_at)",
+        "idx_assignments_course_deleted_due": "assignments (course_name, deleted, due_at)",
+        "idx_deleted_assignments_deleted_at": "deleted_assignments (deleted_at)",
+    }),
+    _sync_indexes({
+        "idx_assignments_deleted_due_id": "assignments (deleted, due_at, assignment_id)",
+        "idx_assignments_course_deleted_due_id": "assignments (course_name, deleted, due_at, assignment_id)",
+        "idx_deleted_assignments_deleted_at": "deleted_assignments (deleted_at)",
+    }),
+    _migrate_data_version,
+    _migrate_row_versions,
+    _sync_indexes({
+        "idx_assignments_deleted_due_id": "assignments (deleted, due_at, assignment_id)",
+        "idx_assignments_course_deleted_due_id": "assignments (course_name, deleted, due_at, assignment_id)",
+        "idx_assignments_row_version": "assignments (row_version)",
+        "idx_deleted_assignments_deleted_at": "deleted_assignments (deleted_at)",
+        "idx_deleted_assignments_row_version": "deleted_assignments (row_version)",
+    }),
+    _migrate_course_sync_state,
+    _migrate_http_cache,
+    _migrate_ai_cache,
+    _migrate_ai_jobs,
+    _migrate_insights_summary_cache,
+    _migrate_ai_job_leases,
+    _backfill_row_versions,
+]
+SCHEMA_VERSION = len(SCHEMA_MIGRATIONS)
 
 class Database:
-    def __init__(self, db_path="studysync.db"):
+    def __init__(self, db_path="studysync.db", storage_profile="wal", pool_size=8, health_check_interval=30):
+        if storage_profile not in STORAGE_PROFILES:
+            raise ValueError(f"Unknown storage profile '{storage_profile}'. Choose one of: {', '.join(STORAGE_PROFILES)}")
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.storage_profile = STORAGE_PROFILES[storage_profile]
+        self.health_check_interval = health_check_interval
+        self._pool = queue.LifoQueue(maxsize=pool_size)
+        self._closed = False
         self.init_database()
+        atexit.register(self.close)
 
     def init_database(self):
         try:
             if self.db_path.exists() and self.db_path.stat().st_size == 0:
                 print(f"Database file is empty at {self.db_path}, recreating...")
-                self.db_path.unlink()
-
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
-
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-            existing_tables = [row[0] for row in cursor.fetchall()]
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS assignments (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    assignment_id TEXT UNIQUE NOT NULL,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    due_at TEXT NOT NULL,
-                    course_name TEXT NOT NULL,
-                    reminder_list TEXT NOT NULL,
-                    ai_notes TEXT,
-                    reminder_added INTEGER DEFAULT 0,
-                    status TEXT DEFAULT "Not Started",
-                    priority TEXT DEFAULT "Medium",
-                    user_notes TEXT DEFAULT "",
-                    deleted INTEGER DEFAULT 0,
-                    deleted_at TIMESTAMP DEFAULT NULL,
-                    time_estimate REAL DEFAULT NULL,
-                    suggested_priority TEXT DEFAULT NULL,
-                    ai_confidence INTEGER DEFAULT NULL,
-                    ai_confidence_explanation TEXT DEFAULT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS deleted_assignments (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    assignment_id TEXT UNIQUE NOT NULL,
-                    title TEXT NOT NULL,
-                    course_name TEXT NOT NULL,
-                    deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS courses (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    course_name TEXT UNIQUE NOT NULL,
-                    reminder_list TEXT NOT NULL,
-                    enabled INTEGER DEFAULT 1,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+                self._remove_database_files()
 
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS settings (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    key TEXT UNIQUE NOT NULL,
-                    value TEXT NOT NULL,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS ai_insights (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    insights_json TEXT NOT NULL,
-                    generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_sync_before TIMESTAMP,
-                    end_date TEXT
-                )
-            ''')
+            self._migrate()
+        except (sqlite3.Error, OSError) as e:
+            print(f"Database error detected: {e}. Recreating database...")
+            self._remove_database_files()
+            self._migrate()
 
-            if 'assignments' in existing_tables:
-                new_columns = [
-                    ('status', 'TEXT DEFAULT "Not Started"'),
-                    ('priority', 'TEXT DEFAULT "Medium"'),
-                    ('user_notes', 'TEXT DEFAULT ""'),
-                    ('deleted', 'INTEGER DEFAULT 0'),
-                    ('deleted_at', 'TIMESTAMP DEFAULT NULL'),
-                    ('time_estimate', 'REAL DEFAULT NULL'),
-                    ('suggested_priority', 'TEXT DEFAULT NULL'),
-                    ('ai_confidence', 'INTEGER DEFAULT NULL'),
-                    ('ai_confidence_explanation', 'TEXT DEFAULT NULL')
-                ]
-
-                for column_name, column_def in new_columns:
-                    try:
-                        cursor.execute(f'ALTER TABLE assignments ADD COLUMN {column_name} {column_def}')
-                    except sqlite3.OperationalError as e:
-                        if 'duplicate column' not in str(e).lower():
-                            raise
+    def _remove_database_files(self):
+        for suffix in ("", "-wal", "-shm"):
+            path = Path(f"{self.db_path}{suffix}")
+            if path.exists():
+                path.unlink()
 
-            if 'courses' in existing_tables:
+    def _migrate(self):
+        conn = sqlite3.connect(str(self.db_path), isolation_level=None)
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            while version < SCHEMA_VERSION:
+                conn.execute("BEGIN IMMEDIATE")
                 try:
-                    cursor.execute('ALTER TABLE courses ADD COLUMN enabled INTEGER DEFAULT 1')
-                except sqlite3.OperationalError as e:
-                    if 'duplicate column' not in str(e).lower():
-                        raise
-
-            conn.commit()
+                    # Another process may have migrated while we waited for the write lock.
+                    version = conn.execute("PRAGMA user_version").fetchone()[0]
+                    if version < SCHEMA_VERSION:
+                        SCHEMA_MIGRATIONS[version](conn.cursor())
+                        version += 1
+                        conn.execute(f"PRAGMA user_version = {version}")
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+
+            self._apply_journal_mode(conn)
+        finally:
             conn.close()
-        except (sqlite3.Error, OSError) as e:
-            print(f"Database error detected: {e}. Recreating database...")
 
+    def _apply_journal_mode(self, conn):
+        journal_mode = self.storage_profile["journal_mode"]
+        result = conn.execute(f"PRAGMA journal_mode = {journal_mode}").fetchone()
+        if not result or result[0].lower() != journal_mode.lower():
+            print(f"WARNING: Could not switch database to {journal_mode} journal mode (using {result[0] if result else 'unknown'}).")
+
+    def _configure_connection(self, conn):
+        profile = self.storage_profile
+        conn.execute(f"PRAGMA synchronous = {profile['synchronous']}")
+        conn.execute(f"PRAGMA cache_size = {int(profile['cache_size'])}")
+        conn.execute(f"PRAGMA mmap_size = {int(profile['mmap_size'])}")
+        conn.execute(f"PRAGMA busy_timeout = {int(profile['busy_timeout'])}")
+        conn.execute(f"PRAGMA wal_autocheckpoint = {int(profile['wal_autocheckpoint'])}")
+        return conn
+
+    def _connect(self):
+        if not self.db_path.exists():
+            print("Database file missing, reinitializing...")
+            self.init_database()
+
+        try:
+            return self._configure_connection(sqlite3.connect(str(self.db_path), check_same_thread=False))
+        except (sqlite3.Error, OSError) as e:
+            print(f"Database connection error: {e}. Reinitializing...")
             try:
-                if 'conn' in locals():
-                    conn.close()
+                self._remove_database_files()
             except Exception:
                 pass
+            self.init_database()
+            return self._configure_connection(sqlite3.connect(str(self.db_path), check_same_thread=False))
 
-            if self.db_path.exists():
-                self.db_path.unlink()
+    def _is_healthy(self, conn):
+        if not self.db_path.exists():
+            return False
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
 
-            conn = sqlite3.connect(str(self.db_path))
-            cursor = conn.cursor()
+    def _discard_connection(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
 
-            cursor.execute('''
-                CREATE TABLE assignments (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    assignment_id TEXT UNIQUE NOT NULL,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    due_at TEXT NOT NULL,
-                    course_name TEXT NOT NULL,
-                    reminder_list TEXT NOT NULL,
-                    ai_notes TEXT,
-                    reminder_added INTEGER DEFAULT 0,
-                    status TEXT DEFAULT "Not Started",
-                    priority TEXT DEFAULT "Medium",
-                    user_notes TEXT DEFAULT "",
-                    deleted INTEGER DEFAULT 0,
-                    deleted_at TIMESTAMP DEFAULT NULL,
-                    time_estimate REAL DEFAULT NULL,
-                    suggested_priority TEXT DEFAULT NULL,
-                    ai_confidence INTEGER DEFAULT NULL,
-                    ai_confidence_explanation TEXT DEFAULT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+    def get_connection(self):
+        while True:
+            try:
+                conn, released_at = self._pool.get_nowait()
+            except queue.Empty:
+                return self._connect()
 
-            cursor.execute('''
-                CREATE TABLE deleted_assignments (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    assignment_id TEXT UNIQUE NOT NULL,
-                    title TEXT NOT NULL,
-                    course_name TEXT NOT NULL,
-                    deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+            if time.monotonic() - released_at < self.health_check_interval or self._is_healthy(conn):
+                return conn
+            self._discard_connection(conn)
 
-            cursor.execute('''
-                CREATE TABLE courses (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    course_name TEXT UNIQUE NOT NULL,
-                    reminder_list TEXT NOT NULL,
-                    enabled INTEGER DEFAULT 1,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+    def release_connection(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard_connection(conn)
+            return
 
-            cursor.execute('''
-                CREATE TABLE settings (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    key TEXT UNIQUE NOT NULL,
-                    value TEXT NOT NULL,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
+        if self._closed:
+            self._discard_connection(conn)
+            return
 
-            cursor.execute('''
-                CREATE TABLE ai_insights (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    insights_json TEXT NOT NULL,
-                    generated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_sync_before TIMESTAMP,
-                    end_date TEXT
-                )
-            ''')
+        try:
+            self._pool.put_nowait((conn, time.monotonic()))
+        except queue.Full:
+            self._discard_connection(conn)
 
-            conn.commit()
-            conn.close()
+    @contextmanager
+    def connection(self):
+        conn = self.get_connection()
+        try:
+            yield conn
+        except sqlite3.Error:
+            self._discard_connection(conn)
+            raise
+        except BaseException:
+            self.release_connection(conn)
+            raise
+        else:
+            self.release_connection(conn)
 
-    def get_connection(self):
-        if not self.db_path.exists():
-            print("Database file missing, reinitializing...")
-            self.init_database()
-        
+    def checkpoint(self, mode="PASSIVE"):
+        if self.storage_profile["journal_mode"].upper() != "WAL":
+            return None
+        with self.connection() as conn:
+            return conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+
+    def close(self):
+        if self._closed:
+            return
         try:
-            conn = sqlite3.connect(str(self.db_path))
-            conn.execute("SELECT 1").fetchone()
-            return conn
-        except (sqlite3.Error, OSError) as e:
-            print(f"Database connection error: {e}. Reinitializing...")
+            with self.connection() as conn:
+                conn.execute("PRAGMA optimize")
+            self.checkpoint("TRUNCATE")
+        except sqlite3.Error:
+            pass
+
+        self._closed = True
+        while True:
             try:
-                if self.db_path.exists():
-                    self.db_path.unlink()
-            except Exception:
-                pass
-            self.init_database()
-            return sqlite3.connect(str(self.db_path))
+                conn, _ = self._pool.get_nowait()
+            except queue.Empty:
+                break
+            self._discard_connection(conn)
+
+    def _bump_data_version(self, cursor):
+        cursor.execute('UPDATE data_version SET version = version + 1 WHERE id = 1')
+        cursor.execute('SELECT version FROM data_version WHERE id = 1')
+        return cursor.fetchone()[0]
+
+    def get_data_version(self):
+        with self.connection() as conn:
+            return conn.execute('SELECT version FROM data_version WHERE id = 1').fetchone()[0]
 
     def save_assignment(self, assignment_id, title, description, due_at, course_name, reminder_list, ai_notes=""):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        self.save_assignments_bulk([{
+            'assignment_id': assignment_id,
+            'title': title,
+            'description': description,
+            'due_at': due_at,
+            'course_name': course_name,
+            'reminder_list': reminder_list,
+            'ai_notes': ai_notes
+        }])
+
+    def save_assignments_bulk(self, rows, batch_size=500):
+        rows = list(rows)
+        if not rows:
+            return []
 
-        cursor.execute('SELECT assignment_id FROM deleted_assignments WHERE assignment_id = ?', (assignment_id,))
-        if cursor.fetchone():
-            conn.close()
-            return
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            INSERT OR REPLACE INTO assignments
-            (assignment_id, title, description, due_at, course_name, reminder_list, ai_notes, reminder_added,
-             status, priority, user_notes, deleted, time_estimate, suggested_priority, ai_confidence, ai_confidence_explanation, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?,
-                    COALESCE((SELECT reminder_added FROM assignments WHERE assignment_id = ?), 0),
-                    COALESCE((SELECT status FROM assignments WHERE assignment_id = ?), 'Not Started'),
-                    COALESCE((SELECT priority FROM assignments WHERE assignment_id = ?), 'Medium'),
-                    COALESCE((SELECT user_notes FROM assignments WHERE assignment_id = ?), ''),
-                    COALESCE((SELECT deleted FROM assignments WHERE assignment_id = ?), 0),
-                    COALESCE((SELECT time_estimate FROM assignments WHERE assignment_id = ?), NULL),
-                    COALESCE((SELECT suggested_priority FROM assignments WHERE assignment_id = ?), NULL),
-                    COALESCE((SELECT ai_confidence FROM assignments WHERE assignment_id = ?), NULL),
-                    COALESCE((SELECT ai_confidence_explanation FROM assignments WHERE assignment_id = ?), NULL),
-                    CURRENT_TIMESTAMP)
-        ''', (assignment_id, title, description, due_at, course_name, reminder_list, ai_notes,
-              assignment_id, assignment_id, assignment_id, assignment_id, assignment_id, assignment_id, assignment_id, assignment_id, assignment_id))
-
-        conn.commit()
-        conn.close()
+            tombstoned = set()
+            for start in range(0, len(rows), batch_size):
+                batch_ids = [row['assignment_id'] for row in rows[start:start + batch_size]]
+                placeholders = ', '.join('?' * len(batch_ids))
+                cursor.execute(f'SELECT assignment_id FROM deleted_assignments WHERE assignment_id IN ({placeholders})', batch_ids)
+                tombstoned.update(row[0] for row in cursor.fetchall())
+
+            rows_to_save = [row for row in rows if row['assignment_id'] not in tombstoned]
+            if not rows_to_save:
+                return []
+
+            version = self._bump_data_version(cursor)
+            cursor.executemany('''
+                INSERT INTO assignments
+                (assignment_id, title, description, due_at, course_name, reminder_list, ai_notes,
+                 time_estimate, suggested_priority, ai_confidence, ai_confidence_explanation, row_version)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(assignment_id) DO UPDATE SET
+                    title = excluded.title,
+                    description = excluded.description,
+                    due_at = excluded.due_at,
+                    course_name = excluded.course_name,
+                    reminder_list = excluded.reminder_list,
+                    ai_notes = excluded.ai_notes,
+                    time_estimate = COALESCE(excluded.time_estimate, assignments.time_estimate),
+                    suggested_priority = COALESCE(excluded.suggested_priority, assignments.suggested_priority),
+                    ai_confidence = COALESCE(excluded.ai_confidence, assignments.ai_confidence),
+                    ai_confidence_explanation = COALESCE(excluded.ai_confidence_explanation, assignments.ai_confidence_explanation),
+                    row_version = excluded.row_version,
+                    updated_at = CURRENT_TIMESTAMP
+            ''', [(row['assignment_id'], row['title'], row.get('description', ''), row['due_at'],
+                   row['course_name'], row['reminder_list'], row.get('ai_notes', ''),
+                   row.get('time_estimate'), row.get('suggested_priority'),
+                   row.get('ai_confidence'), row.get('ai_confidence_explanation'), version)
+                  for row in rows_to_save])
+
+            conn.commit()
+
+        return [row['assignment_id'] for row in rows_to_save]
 
     def update_assignment_fields(self, assignment_id, **fields):
         if not fields:
             return
 
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        set_clause = ', '.join([f'{k} = ?' for k in fields.keys()])
-        values = list(fields.values()) + [assignment_id]
+            version = self._bump_data_version(cursor)
+            set_clause = ', '.join([f'{k} = ?' for k in fields.keys()])
+            values = list(fields.values()) + [version, assignment_id]
 
-        cursor.execute(f'''
-            UPDATE assignments
-            SET {set_clause}, updated_at = CURRENT_TIMESTAMP
-            WHERE assignment_id = ?
-        ''', values)
+            cursor.execute(f'''
+                UPDATE assignments
+                SET {set_clause}, row_version = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE assignment_id = ?
+            ''', values)
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
     def mark_reminder_added(self, assignment_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            UPDATE assignments
-            SET reminder_added = 1
-            WHERE assignment_id = ?
-        ''', (assignment_id,))
+            version = self._bump_data_version(cursor)
+            cursor.execute('''
+                UPDATE assignments
+                SET reminder_added = 1, row_version = ?
+                WHERE assignment_id = ?
+            ''', (version, assignment_id))
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
     def get_assignment(self, assignment_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        cursor.execute('SELECT * FROM assignments WHERE assignment_id = ?', (assignment_id,))
-        result = cursor.fetchone()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = Assignment.row_factory
 
-        conn.close()
-        return result
+            cursor.execute(f'SELECT {ASSIGNMENT_SELECT} FROM assignments WHERE assignment_id = ?', (assignment_id,))
+            return cursor.fetchone()
 
     def save_course_mapping(self, course_name, reminder_list):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            INSERT OR REPLACE INTO courses (course_name, reminder_list, enabled)
-            VALUES (?, ?, COALESCE((SELECT enabled FROM courses WHERE course_name = ?), 1))
-        ''', (course_name, reminder_list, course_name))
+            cursor.execute('''
+                INSERT OR REPLACE INTO courses (course_name, reminder_list, enabled)
+                VALUES (?, ?, COALESCE((SELECT enabled FROM courses WHERE course_name = ?), 1))
+            ''', (course_name, reminder_list, course_name))
 
-        conn.commit()
-        conn.close()
+            self._bump_data_version(cursor)
+            conn.commit()
 
     def get_course_mapping(self, course_name):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('SELECT reminder_list FROM courses WHERE course_name = ?', (course_name,))
-        result = cursor.fetchone()
+            cursor.execute('SELECT reminder_list FROM courses WHERE course_name = ?', (course_name,))
+            result = cursor.fetchone()
 
-        conn.close()
         return result[0] if result else None
 
     def delete_course_mapping(self, course_name):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('SELECT enabled FROM courses WHERE course_name = ?', (course_name,))
-        exists = cursor.fetchone()
+            cursor.execute('SELECT enabled FROM courses WHERE course_name = ?', (course_name,))
+            exists = cursor.fetchone()
 
-        if exists:
-            cursor.execute('UPDATE courses SET enabled = 0 WHERE course_name = ?', (course_name,))
-        else:
-            cursor.execute('''
-                INSERT INTO courses (course_name, reminder_list, enabled)
-                VALUES (?, ?, 0)
-            ''', (course_name, course_name))
+            if exists:
+                cursor.execute('UPDATE courses SET enabled = 0 WHERE course_name = ?', (course_name,))
+            else:
+                cursor.execute('''
+                    INSERT INTO courses (course_name, reminder_list, enabled)
+                    VALUES (?, ?, 0)
+                ''', (course_name, course_name))
 
-        conn.commit()
-        conn.close()
+            self._bump_data_version(cursor)
+            conn.commit()
         return True
 
     def enable_course_mapping(self, course_name):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('SELECT enabled FROM courses WHERE course_name = ?', (course_name,))
-        exists = cursor.fetchone()
+            cursor.execute('SELECT enabled FROM courses WHERE course_name = ?', (course_name,))
+            exists = cursor.fetchone()
 
-        if exists:
-            cursor.execute('UPDATE courses SET enabled = 1 WHERE course_name = ?', (course_name,))
-        else:
-            cursor.execute('''
-                INSERT INTO courses (course_name, reminder_list, enabled)
-                VALUES (?, ?, 1)
-            ''', (course_name, course_name))
+            if exists:
+                cursor.execute('UPDATE courses SET enabled = 1 WHERE course_name = ?', (course_name,))
+            else:
+                cursor.execute('''
+                    INSERT INTO courses (course_name, reminder_list, enabled)
+                    VALUES (?, ?, 1)
+                ''', (course_name, course_name))
 
-        conn.commit()
-        conn.close()
+            self._bump_data_version(cursor)
+            conn.commit()
         return True
 
     def get_course_mapping_with_enabled(self, course_name):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('SELECT reminder_list, enabled FROM courses WHERE course_name = ?', (course_name,))
-        result = cursor.fetchone()
+            cursor.execute('SELECT reminder_list, enabled FROM courses WHERE course_name = ?', (course_name,))
+            result = cursor.fetchone()
 
-        conn.close()
         return result if result else (None, None)
 
+    def get_all_course_mappings(self):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('SELECT course_name, reminder_list, enabled FROM courses')
+            results = cursor.fetchall()
+
+        return {row[0]: (row[1], row[2]) for row in results}
+
     def get_all_courses_from_db(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('SELECT course_name, reminder_list, enabled FROM courses WHERE enabled = 1')
-        results = cursor.fetchall()
+            cursor.execute('SELECT course_name, reminder_list, enabled FROM courses WHERE enabled = 1')
+            results = cursor.fetchall()
 
-        conn.close()
         return [{'name': row[0], 'reminder_list': row[1] or '', 'enabled': row[2]} for row in results]
 
     def permanently_delete_course(self, course_name):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('DELETE FROM courses WHERE course_name = ?', (course_name,))
+            cursor.execute('DELETE FROM courses WHERE course_name = ?', (course_name,))
 
-        conn.commit()
-        conn.close()
+            self._bump_data_version(cursor)
+            conn.commit()
         return True
 
     def save_setting(self, key, value):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            INSERT OR REPLACE INTO settings (key, value, updated_at)
-            VALUES (?, ?, CURRENT_TIMESTAMP)
-        ''', (key, value))
+            cursor.execute('''
+                INSERT OR REPLACE INTO settings (key, value, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            ''', (key, value))
 
-        conn.commit()
-        conn.close()
+            self._bump_data_version(cursor)
+            conn.commit()
 
     def get_setting(self, key):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('SELECT value FROM settings WHERE key = ?', (key,))
-        result = cursor.fetchone()
+            cursor.execute('SELECT value FROM settings WHERE key = ?', (key,))
+            result = cursor.fetchone()
 
-        conn.close()
         return result[0] if result else None
 
     def save_ai_insights(self, insights_json, last_sync_before, end_date):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('DELETE FROM ai_insights')
+            cursor.execute('DELETE FROM ai_insights')
 
-        est_timestamp = datetime.now(EST).isoformat()
+            est_timestamp = datetime.now(EST).isoformat()
 
-        cursor.execute('''
-            INSERT INTO ai_insights (insights_json, generated_at, last_sync_before, end_date)
-            VALUES (?, ?, ?, ?)
-        ''', (insights_json, est_timestamp, last_sync_before, end_date))
+            cursor.execute('''
+                INSERT INTO ai_insights (insights_json, generated_at, last_sync_before, end_date)
+                VALUES (?, ?, ?, ?)
+            ''', (insights_json, est_timestamp, last_sync_before, end_date))
 
-        conn.commit()
-        conn.close()
+            self._bump_data_version(cursor)
+            conn.commit()
 
     def get_ai_insights(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            SELECT insights_json, generated_at, last_sync_before, end_date
-            FROM ai_insights
-            ORDER BY generated_at DESC
-            LIMIT 1
-        ''')
-        result = cursor.fetchone()
+            cursor.execute('''
+                SELECT insights_json, generated_at, last_sync_before, end_date
+                FROM ai_insights
+                ORDER BY generated_at DESC
+                LIMIT 1
+            ''')
+            result = cursor.fetchone()
 
-        conn.close()
         if result:
             return {
                 'insights_json': result[0],
@@ -456,144 +745,741 @@ class Database:
     def set_last_sync_timestamp(self, timestamp):
         self.save_setting('last_sync_timestamp', timestamp)
 
-    def get_all_assignments(self, include_deleted=False):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def get_sync_watermarks(self, course_id):
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        query = '''
-            SELECT assignment_id, title, description, due_at, course_name, reminder_list, ai_notes, reminder_added,
-                   status, priority, user_notes, deleted, time_estimate, suggested_priority, ai_confidence, ai_confidence_explanation
-            FROM assignments
-        '''
+            cursor.execute('SELECT item_type, watermark FROM course_sync_state WHERE course_id = ?', (str(course_id),))
+            return dict(cursor.fetchall())
+
+    def set_sync_watermarks(self, course_id, watermarks):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.executemany('''
+                INSERT INTO course_sync_state (course_id, item_type, watermark, synced_at)
+                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(course_id, item_type) DO UPDATE SET
+                    watermark = MAX(watermark, excluded.watermark),
+                    synced_at = excluded.synced_at
+            ''', [(str(course_id), item_type, watermark) for item_type, watermark in watermarks.items() if watermark])
+
+            conn.commit()
+
+    def get_cached_response(self, cache_key):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('SELECT etag, body, next_url, fetched_at FROM http_cache WHERE cache_key = ?', (cache_key,))
+            result = cursor.fetchone()
+            if not result:
+                return None
+
+            cursor.execute('UPDATE http_cache SET last_used_at = ? WHERE cache_key = ?', (time.time(), cache_key))
+            conn.commit()
+
+        return {'etag': result[0], 'body': result[1], 'next_url': result[2], 'fetched_at': result[3]}
+
+    def save_cached_response(self, cache_key, url, etag, body, next_url, max_bytes):
+        now = time.time()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                INSERT OR REPLACE INTO http_cache (cache_key, url, etag, body, next_url, size, fetched_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (cache_key, url, etag, body, next_url, len(body), now, now))
+
+            cursor.execute('''
+                DELETE FROM http_cache WHERE cache_key IN (
+                    SELECT cache_key FROM (
+                        SELECT cache_key, SUM(size) OVER (ORDER BY last_used_at DESC, cache_key) AS running_size
+                        FROM http_cache
+                    ) WHERE running_size > ?
+                )
+            ''', (max_bytes,))
+
+            conn.commit()
+
+    def get_cached_ai_result(self, cache_key):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(f'SELECT {", ".join(AI_RESULT_FIELDS)} FROM ai_cache WHERE cache_key = ?', (cache_key,))
+            result = cursor.fetchone()
+            if not result:
+                return None
+
+            cursor.execute('UPDATE ai_cache SET last_used_at = ? WHERE cache_key = ?', (time.time(), cache_key))
+            conn.commit()
+
+        return tuple(result)
+
+    def save_cached_ai_result(self, cache_key, result, max_entries):
+        now = time.time()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(f'''
+                INSERT OR REPLACE INTO ai_cache (cache_key, {", ".join(AI_RESULT_FIELDS)}, created_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (cache_key, *result, now, now))
+
+            cursor.execute('''
+                DELETE FROM ai_cache WHERE cache_key IN (
+                    SELECT cache_key FROM ai_cache ORDER BY last_used_at DESC, cache_key LIMIT -1 OFFSET ?
+                )
+            ''', (max_entries,))
+
+            conn.commit()
+
+    def get_cached_insights_summary(self, cache_key):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('SELECT summary_json FROM insights_summary_cache WHERE cache_key = ?', (cache_key,))
+            result = cursor.fetchone()
+            if not result:
+                return None
+
+            cursor.execute('UPDATE insights_summary_cache SET last_used_at = ? WHERE cache_key = ?', (time.time(), cache_key))
+            conn.commit()
+
+        return json.loads(result[0])
+
+    def save_cached_insights_summary(self, cache_key, summary, max_entries):
+        now = time.time()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('''
+                INSERT OR REPLACE INTO insights_summary_cache (cache_key, summary_json, created_at, last_used_at)
+                VALUES (?, ?, ?, ?)
+            ''', (cache_key, json.dumps(summary), now, now))
+
+            cursor.execute('''
+                DELETE FROM insights_summary_cache WHERE cache_key IN (
+                    SELECT cache_key FROM insights_summary_cache ORDER BY last_used_at DESC, cache_key LIMIT -1 OFFSET ?
+                )
+            ''', (max_entries,))
+
+            conn.commit()
+
+    def enqueue_ai_jobs(self, jobs, lease_seconds=AI_JOB_LEASE_SECONDS):
+        now = time.time()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.executemany('''
+                INSERT INTO ai_jobs (assignment_id, title, description, course_name, college_name, due_at, priority_rank, enqueued_at)
+                VALUES (:assignment_id, :title, :description, :course_name, :college_name, :due_at, :priority_rank, :enqueued_at)
+                ON CONFLICT(assignment_id) DO UPDATE SET
+                    title = excluded.title,
+                    description = excluded.description,
+                    course_name = excluded.course_name,
+                    college_name = excluded.college_name,
+                    due_at = excluded.due_at,
+                    priority_rank = excluded.priority_rank,
+                    status = CASE
+                        WHEN ai_jobs.status = 'running' AND COALESCE(ai_jobs.claimed_at, 0) < :lease_expired_before THEN 'pending'
+                        ELSE ai_jobs.status
+                    END
+            ''', [{
+                'assignment_id': job['assignment_id'],
+                'title': job['title'],
+                'description': job.get('description', ''),
+                'course_name': job.get('course_name', ''),
+                'college_name': job.get('college_name', ''),
+                'due_at': job.get('due_at'),
+                'priority_rank': PRIORITY_RANKS.get(job.get('priority'), PRIORITY_RANKS['Medium']),
+                'enqueued_at': now,
+                'lease_expired_before': now - lease_seconds
+            } for job in jobs])
+
+            conn.commit()
+
+    def claim_ai_jobs(self, limit):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('''
+                SELECT assignment_id, title, description, course_name, college_name, attempts
+                FROM ai_jobs
+                WHERE status = 'pending'
+                ORDER BY due_at IS NULL, due_at, priority_rank, enqueued_at
+                LIMIT ?
+            ''', (limit,))
+            jobs = cursor.fetchall()
+
+            cursor.executemany(
+                "UPDATE ai_jobs SET status = 'running', attempts = attempts + 1, claimed_at = ? WHERE assignment_id = ?",
+                [(time.time(), job[0]) for job in jobs]
+            )
+            conn.commit()
+
+        return jobs
+
+    def finish_ai_job(self, assignment_id, retry=False):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            if retry:
+                cursor.execute("UPDATE ai_jobs SET status = 'pending' WHERE assignment_id = ?", (assignment_id,))
+            else:
+                cursor.execute('DELETE FROM ai_jobs WHERE assignment_id = ?', (assignment_id,))
+
+            conn.commit()
+
+    def release_ai_jobs(self, assignment_ids):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.executemany(
+                "UPDATE ai_jobs SET status = 'pending', attempts = MAX(attempts - 1, 0) WHERE assignment_id = ? AND status = 'running'",
+                [(assignment_id,) for assignment_id in assignment_ids]
+            )
+            conn.commit()
+
+    def reset_running_ai_jobs(self, lease_seconds=AI_JOB_LEASE_SECONDS):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute(
+                "UPDATE ai_jobs SET status = 'pending' WHERE status = 'running' AND COALESCE(claimed_at, 0) < ?",
+                (time.time() - lease_seconds,)
+            )
+            conn.commit()
+
+    def count_pending_ai_jobs(self):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("SELECT COUNT(*) FROM ai_jobs WHERE status = 'pending'")
+            return cursor.fetchone()[0]
+
+    def apply_ai_result(self, assignment_id, result):
+        with self.connection() as conn:
+            cursor = conn.cursor()
+
+            version = self._bump_data_version(cursor)
+            cursor.execute(f'''
+                UPDATE assignments
+                SET {', '.join(f'{field} = ?' for field in AI_RESULT_FIELDS)}, row_version = ?, updated_at = CURRENT_TIMESTAMP
+                WHERE assignment_id = ? AND (ai_notes IS NULL OR TRIM(ai_notes) = '')
+            ''', [result[field] for field in AI_RESULT_FIELDS] + [version, assignment_id])
+
+            if cursor.rowcount:
+                conn.commit()
+            else:
+                conn.rollback()
+
+    def get_all_assignments(self, include_deleted=False):
+        query = f'SELECT {ASSIGNMENT_SELECT} FROM assignments'
 
         if not include_deleted:
             query += ' WHERE deleted = 0'
 
         query += ' ORDER BY due_at ASC'
 
-        cursor.execute(query)
-        results = cursor.fetchall()
-        conn.close()
-        return results
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = Assignment.row_factory
+            cursor.execute(query)
+            return cursor.fetchall()
+
+    def get_assignments_page(self, limit=None, after=None, course_name=None, status=None, priority=None, deleted=False, fields=ASSIGNMENT_COLUMNS):
+        columns = tuple(dict.fromkeys(('assignment_id', 'due_at') + tuple(fields)))
+        conditions = []
+        params = []
+
+        if deleted is not None:
+            conditions.append('deleted = ?')
+            params.append(1 if deleted else 0)
+        if course_name is not None:
+            conditions.append('course_name = ?')
+            params.append(course_name)
+        if status is not None:
+            conditions.append('status = ?')
+            params.append(status)
+        if priority is not None:
+            conditions.append('priority = ?')
+            params.append(priority)
+        if after is not None:
+            conditions.append('(due_at, assignment_id) > (?, ?)')
+            params.extend(after)
+
+        query = f'SELECT {", ".join(columns)} FROM assignments'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY due_at ASC, assignment_id ASC'
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit + 1)
+
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = lambda cursor, row: Assignment.from_columns(columns, row)
+            cursor.execute(query, params)
+            results = cursor.fetchall()
+
+        next_after = None
+        if limit is not None and len(results) > limit:
+            results = results[:limit]
+            next_after = (results[-1].due_at, results[-1].assignment_id)
+        return results, next_after
+
+    def get_changes_since(self, since, fields=ASSIGNMENT_COLUMNS):
+        columns = tuple(dict.fromkeys(('assignment_id', 'deleted') + tuple(fields)))
+
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('BEGIN')
+            cursor.execute('SELECT version FROM data_version WHERE id = 1')
+            version = cursor.fetchone()[0]
+
+            cursor.row_factory = lambda cursor, row: Assignment.from_columns(columns, row)
+            cursor.execute(f'SELECT {", ".join(columns)} FROM assignments WHERE row_version > ? ORDER BY due_at ASC, assignment_id ASC', (since,))
+            changed = cursor.fetchall()
+
+            cursor.row_factory = None
+            cursor.execute('SELECT assignment_id FROM deleted_assignments WHERE row_version > ?', (since,))
+            tombstones = [row[0] for row in cursor.fetchall()]
+            conn.commit()
+
+        upserted = [assignment for assignment in changed if not assignment.deleted]
+        deleted = list(dict.fromkeys([assignment.assignment_id for assignment in changed if assignment.deleted] + tombstones))
+        return version, upserted, deleted
 
     def delete_assignment(self, assignment_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('SELECT title, course_name FROM assignments WHERE assignment_id = ?', (assignment_id,))
-        assignment = cursor.fetchone()
+            cursor.execute('SELECT title, course_name FROM assignments WHERE assignment_id = ?', (assignment_id,))
+            assignment = cursor.fetchone()
 
-        if assignment:
-            cursor.execute('UPDATE assignments SET deleted = 1, deleted_at = CURRENT_TIMESTAMP WHERE assignment_id = ?', (assignment_id,))
+            version = self._bump_data_version(cursor)
+            if assignment:
+                cursor.execute('UPDATE assignments SET deleted = 1, deleted_at = CURRENT_TIMESTAMP, row_version = ? WHERE assignment_id = ?', (version, assignment_id))
 
-            cursor.execute('''
-                INSERT OR REPLACE INTO deleted_assignments (assignment_id, title, course_name, deleted_at)
-                VALUES (?, ?, ?, CURRENT_TIMESTAMP)
-            ''', (assignment_id, assignment[0], assignment[1]))
+                cursor.execute('''
+                    INSERT OR REPLACE INTO deleted_assignments (assignment_id, title, course_name, deleted_at, row_version)
+                    VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?)
+                ''', (assignment_id, assignment[0], assignment[1], version))
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
     def is_assignment_permanently_deleted(self, assignment_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('SELECT assignment_id FROM deleted_assignments WHERE assignment_id = ?', (assignment_id,))
-        result = cursor.fetchone()
+            cursor.execute('SELECT assignment_id FROM deleted_assignments WHERE assignment_id = ?', (assignment_id,))
+            result = cursor.fetchone()
 
-        conn.close()
         return result is not None
 
     def get_deleted_assignments(self):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('''
-            SELECT assignment_id, title, course_name, deleted_at
-            FROM deleted_assignments
-            ORDER BY deleted_at DESC
-        ''')
+            cursor.execute('''
+                SELECT assignment_id, title, course_name, deleted_at
+                FROM deleted_assignments
+                ORDER BY deleted_at DESC
+            ''')
 
-        results = cursor.fetchall()
-        conn.close()
-        return results
+            return cursor.fetchall()
+
+    def get_existing_assignment_ids(self, assignment_ids, batch_size=500):
+        assignment_ids = list(assignment_ids)
+        existing = set()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            for start in range(0, len(assignment_ids), batch_size):
+                batch_ids = assignment_ids[start:start + batch_size]
+                placeholders = ', '.join('?' * len(batch_ids))
+                cursor.execute(f'SELECT assignment_id FROM assignments WHERE assignment_id IN ({placeholders})', batch_ids)
+                existing.update(row[0] for row in cursor.fetchall())
+        return existing
 
     def restore_assignment(self, assignment_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('DELETE FROM deleted_assignments WHERE assignment_id = ?', (assignment_id,))
+            version = self._bump_data_version(cursor)
+            cursor.execute('DELETE FROM deleted_assignments WHERE assignment_id = ?', (assignment_id,))
 
-        cursor.execute('UPDATE assignments SET deleted = 0, deleted_at = NULL WHERE assignment_id = ?', (assignment_id,))
+            cursor.execute('UPDATE assignments SET deleted = 0, deleted_at = NULL, row_version = ? WHERE assignment_id = ?', (version, assignment_id))
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
     def permanently_delete_assignment(self, assignment_id):
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self.connection() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute('SELECT title, course_name FROM assignments WHERE assignment_id = ?', (assignment_id,))
-        assignment = cursor.fetchone()
+            cursor.execute('SELECT title, course_name FROM assignments WHERE assignment_id = ?', (assignment_id,))
+            assignment = cursor.fetchone()
 
-        cursor.execute('DELETE FROM assignments WHERE assignment_id = ?', (assignment_id,))
+            cursor.execute('DELETE FROM assignments WHERE assignment_id = ?', (assignment_id,))
 
-        if assignment:
-            cursor.execute('''
-                INSERT OR REPLACE INTO deleted_assignments (assignment_id, title, course_name, deleted_at)
-                VALUES (?, ?, ?, COALESCE((SELECT deleted_at FROM deleted_assignments WHERE assignment_id = ?), CURRENT_TIMESTAMP))
-            ''', (assignment_id, assignment[0], assignment[1], assignment_id))
-        else:
-            cursor.execute('SELECT assignment_id FROM deleted_assignments WHERE assignment_id = ?', (assignment_id,))
-            if not cursor.fetchone():
+            if assignment:
                 cursor.execute('''
-                    INSERT INTO deleted_assignments (assignment_id, title, course_name, deleted_at)
-                    VALUES (?, 'Unknown', 'Unknown', CURRENT_TIMESTAMP)
-                ''', (assignment_id,))
+                    INSERT OR REPLACE INTO deleted_assignments (assignment_id, title, course_name, deleted_at)
+                    VALUES (?, ?, ?, COALESCE((SELECT deleted_at FROM deleted_assignments WHERE assignment_id = ?), CURRENT_TIMESTAMP))
+                ''', (assignment_id, assignment[0], assignment[1], assignment_id))
+            else:
+                cursor.execute('SELECT assignment_id FROM deleted_assignments WHERE assignment_id = ?', (assignment_id,))
+                if not cursor.fetchone():
+                    cursor.execute('''
+                        INSERT INTO deleted_assignments (assignment_id, title, course_name, deleted_at)
+                        VALUES (?, 'Unknown', 'Unknown', CURRENT_TIMESTAMP)
+                    ''', (assignment_id,))
+
+            version = self._bump_data_version(cursor)
+            cursor.execute('UPDATE deleted_assignments SET row_version = ? WHERE assignment_id = ?', (version, assignment_id))
+            conn.commit()
+
+DESCRIPTION_MAX_CHARS = 2000
+
+HTML_SKIPPED_TAGS = frozenset({'script', 'style', 'iframe', 'noscript', 'svg', 'object', 'template', 'head'})
+HTML_VOID_TAGS = frozenset({'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+                            'param', 'source', 'track', 'wbr'})
+HTML_BLOCK_TAGS = frozenset({'br', 'p', 'div', 'li', 'tr', 'td', 'th', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+                             'blockquote', 'pre', 'table', 'ul', 'ol', 'hr', 'section', 'article'})
+DATA_URI = re.compile(r'data:[\w/+.-]+(?:;[\w=.-]+)*,[A-Za-z0-9+/=%_-]+')
+WHITESPACE = re.compile(r'\s+')
+HTML_FEED_CHUNK = 8192
+
+class _HTMLTextExtractor(HTMLParser):
+    def __init__(self, max_chars):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.parts = []
+        self.length = 0
+        self.open_tags = []
+        # Depth in open_tags of the outermost skipped element, or None while text is kept.
+        self.skip_from = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in HTML_BLOCK_TAGS:
+            self.parts.append(' ')
+        if tag in HTML_VOID_TAGS:
+            return
+        if tag == 'body':
+            self.handle_endtag('head')
+        self.open_tags.append(tag)
+        if tag in HTML_SKIPPED_TAGS and self.skip_from is None:
+            self.skip_from = len(self.open_tags) - 1
+
+    def handle_startendtag(self, tag, attrs):
+        if tag in HTML_BLOCK_TAGS:
+            self.parts.append(' ')
+
+    def handle_endtag(self, tag):
+        if tag in HTML_BLOCK_TAGS:
+            self.parts.append(' ')
+        if tag not in self.open_tags:
+            return
+        depth = len(self.open_tags) - 1 - self.open_tags[::-1].index(tag)
+        del self.open_tags[depth:]
+        if self.skip_from is not None and depth <= self.skip_from:
+            self.skip_from = None
+
+    def handle_data(self, data):
+        if self.skip_from is None and self.length <= self.max_chars:
+            self.parts.append(data)
+            self.length += len(data)
+
+def html_to_text(markup, max_chars=DESCRIPTION_MAX_CHARS):
+    """Return the readable text of a Canvas HTML description, cut at a word boundary within max_chars."""
+    if not markup:
+        return ""
+    markup = DATA_URI.sub('', markup)
+    if '<' in markup or '&' in markup:
+        extractor = _HTMLTextExtractor(max_chars)
+        for start in range(0, len(markup), HTML_FEED_CHUNK):
+            extractor.feed(markup[start:start + HTML_FEED_CHUNK])
+            if extractor.length > max_chars:
+                break
+        else:
+            extractor.close()
+        text = ''.join(extractor.parts)
+    else:
+        text = markup
+    text = WHITESPACE.sub(' ', text).strip()
+    if len(text) > max_chars:
+        text = text[:max_chars].rsplit(' ', 1)[0] + '...'
+    return text
+
+JSON_STRING_LITERAL = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+JSON_CONTROL_CHAR = re.compile(r'[\x00-\x1f]')
+JSON_CONTROL_ESCAPES = {'\n': '\\n', '\r': '\\r', '\t': '\\t'}
+JSON_DECODER = json.JSONDecoder()
+JSON_SCAN_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*(?:"|\Z)|[][{}]')
+
+def _json_candidate_end(text, start):
+    """Return the index just past the bracket that closes the one at start, or -1 if it never closes."""
+    depth = 0
+    for match in JSON_SCAN_TOKEN.finditer(text, start):
+        token = match.group()
+        if token in '[{':
+            depth += 1
+        elif token in ']}':
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    return -1
+
+def _decode_json_container(text):
+    try:
+        parsed = json.loads(text)
+        if isinstance(parsed, (dict, list)):
+            return parsed
+    except json.JSONDecodeError:
+        pass
+
+    # A failed candidate is skipped whole, so a fragment nested inside it is never returned.
+    index = min((i for i in (text.find('{'), text.find('[')) if i != -1), default=-1)
+    while index != -1:
+        try:
+            parsed, _ = JSON_DECODER.raw_decode(text, index)
+            return parsed
+        except json.JSONDecodeError as e:
+            if e.msg.startswith('Invalid control character'):
+                return None
+            end = _json_candidate_end(text, index)
+            if end == -1:
+                return None
+            next_brace, next_bracket = text.find('{', end), text.find('[', end)
+            index = min((i for i in (next_brace, next_bracket) if i != -1), default=-1)
+    return None
+
+def _escape_control_chars(match):
+    return JSON_CONTROL_CHAR.sub(lambda char: JSON_CONTROL_ESCAPES.get(char.group(), ''), match.group())
+
+def parse_json_response(text):
+    """Return the first complete JSON object or array in a model response, or None."""
+    if not text:
+        return None
+    text = text.strip()
+    parsed = _decode_json_container(text)
+    if parsed is None:
+        escaped = JSON_STRING_LITERAL.sub(_escape_control_chars, text)
+        if escaped != text:
+            parsed = _decode_json_container(escaped)
+    return parsed
 
-        conn.commit()
-        conn.close()
+INSIGHTS_CHUNK_SIZE = 25
 
 class AIEnhancer:
-    def __init__(self, ollama_model):
+    def __init__(self, ollama_model, num_parallel=None, cache=None, cache_max_entries=5000, batch_size=None,
+                 insights_chunk_size=INSIGHTS_CHUNK_SIZE):
         load_dotenv()
         if not ollama_model:
             raise ValueError("ollama_model is required")
         self.ollama_model = ollama_model
-        self.ollama_url = "http://localhost:11434/api/generate"
+        self.ollama_host = "http://localhost:11434"
+        self.ollama_url = f"{self.ollama_host}/api/generate"
+        self.keep_alive = self._parse_keep_alive(os.getenv("OLLAMA_KEEP_ALIVE") or "30m")
+
+        self.num_parallel = max(1, int(num_parallel or os.getenv("OLLAMA_NUM_PARALLEL") or 4))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.num_parallel)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=self.num_parallel)
+        self.batch_size = max(1, int(batch_size or os.getenv("OLLAMA_BATCH_SIZE") or 1))
+        self._timings = deque(maxlen=50)
+        self._first_token_timings = deque(maxlen=50)
+        self.token_counts = {'calls': 0, 'prompt_tokens': 0, 'generated_tokens': 0}
+        self._timings_lock = threading.Lock()
+        self.probe_ttl = 30
+        self._health = None
+        self._warm_up = None
+        self.load_time = None
+        self.first_token_time = None
+        self.cache = cache
+        self.cache_max_entries = cache_max_entries
+
         self.model = self._initialize_model()
         self.prompts_dir = Path(__file__).parent / "aiPrompts"
         self.assignment_prompt_template = self._load_prompt("assignment_enhancement.txt")
+        self.batch_prompt_template = self._load_prompt("assignment_batch_enhancement.txt")
+        self.assignment_prompt_version = hashlib.sha256(self.assignment_prompt_template.encode('utf-8')).hexdigest()[:16]
         self.insights_prompt_template = self._load_prompt("comprehensive_insights.txt")
+        self.insights_chunk_prompt_template = self._load_prompt("insights_chunk_summary.txt")
+        self.insights_reduce_prompt_template = self._load_prompt("insights_reduce.txt")
+        self.insights_chunk_prompt_version = hashlib.sha256(self.insights_chunk_prompt_template.encode('utf-8')).hexdigest()[:16]
+        self.insights_chunk_size = insights_chunk_size
 
     def _load_prompt(self, filename):
         prompt_path = self.prompts_dir / filename
         with open(prompt_path, 'r', encoding='utf-8') as f:
             return f.read()
 
-    def _initialize_model(self):
+    @staticmethod
+    def _parse_keep_alive(value):
         try:
-            response = requests.get("http://localhost:11434/api/tags", timeout=2)
-            if response.status_code == 200:
-                return "ollama"
+            return int(value)
+        except ValueError:
+            return value
+
+    def probe(self, max_age=None):
+        """Return whether Ollama is up and the model resident, cached for max_age (default probe_ttl) seconds."""
+        max_age = self.probe_ttl if max_age is None else max_age
+        if self._health and time.time() - self._health['checked_at'] < max_age:
+            return self._health
+
+        health = {'available': False, 'resident': False, 'latency_ms': None,
+                  'error': None, 'checked_at': time.time()}
+        try:
+            start = time.perf_counter()
+            response = self.session.get(f"{self.ollama_host}/api/tags", timeout=2)
+            health['latency_ms'] = round((time.perf_counter() - start) * 1000, 1)
+            health['available'] = response.status_code == 200
+            if health['available']:
+                loaded = self.session.get(f"{self.ollama_host}/api/ps", timeout=2)
+                if loaded.status_code == 200:
+                    names = {m.get('name') for m in loaded.json().get('models', [])}
+                    health['resident'] = bool(names & {self.ollama_model, f"{self.ollama_model}:latest"})
             else:
-                print("WARNING: Ollama service not responding. AI features will be disabled.")
-                return None
+                health['error'] = f"HTTP {response.status_code}"
+        except Exception as e:
+            health['error'] = str(e)
+        self._health = health
+        return health
+
+    def _initialize_model(self, max_age=None):
+        health = self.probe(max_age)
+        if health['available']:
+            return "ollama"
+        if health['error'] and not health['error'].startswith("HTTP"):
+            print(f"WARNING: Ollama not available ({health['error']}). AI features will be disabled.")
+        else:
+            print("WARNING: Ollama service not responding. AI features will be disabled.")
+        return None
+
+    def reconnect(self):
+        if not self.model:
+            self.model = self._initialize_model()
+            if self.model:
+                self.start_warm_up()
+        return self.model
+
+    def warm_up(self):
+        """Load the model with an empty prompt; returns the load time, or None on failure."""
+        try:
+            start = time.perf_counter()
+            payload = {"model": self.ollama_model, "keep_alive": self.keep_alive}
+            response = self.session.post(self.ollama_url, json=payload, timeout=120)
+            response.raise_for_status()
+            self.load_time = time.perf_counter() - start
+            if self._health:
+                self._health['resident'] = True
+            return self.load_time
         except Exception as e:
-            print(f"WARNING: Ollama not available ({e}). AI features will be disabled.")
+            print(f"WARNING: Ollama warm-up failed ({e}).")
+            return None
+
+    def start_warm_up(self):
+        """Run warm_up once on a daemon thread; returns its future, or None when Ollama is down."""
+        if not self.model:
+            return None
+        with self._timings_lock:
+            if self._warm_up is None or (self._warm_up.done() and self.load_time is None):
+                future = Future()
+                self._warm_up = future
+                threading.Thread(target=lambda: future.set_result(self.warm_up()), daemon=True).start()
+            return self._warm_up
+
+    def status(self):
+        health = dict(self.probe())
+        with self._timings_lock:
+            first_token = list(self._first_token_timings)
+            timings = list(self._timings)
+            token_counts = dict(self.token_counts)
+        health.update({
+            'model': self.ollama_model,
+            'keep_alive': self.keep_alive,
+            'load_time': self.load_time,
+            'first_token_time': self.first_token_time,
+            'avg_first_token_time': sum(first_token) / len(first_token) if first_token else None,
+            'avg_response_time': sum(timings) / len(timings) if timings else None,
+            'token_counts': token_counts,
+        })
+        return health
+
+    def _clean_description(self, assignment_description):
+        return html_to_text(assignment_description) or "No description provided"
+
+    def _cache_key(self, assignment_title, clean_description, college_name):
+        key_parts = [self.ollama_model, self.assignment_prompt_version,
+                     ' '.join(assignment_title.split()), clean_description, college_name]
+        return hashlib.sha256(json.dumps(key_parts).encode('utf-8')).hexdigest()
+
+    def _parse_assignment_response(self, ai_response):
+        if not self._validate_ai_response(ai_response):
             return None
 
-    def enhance_assignment(self, assignment_title, assignment_description="", course_name="", college_name=""):
+        time_estimate = None
+        suggested_priority = None
+        ai_confidence = None
+        ai_confidence_explanation = None
+
+        normalized_lines = []
+        lines = ai_response.split('\n')
+        for line in lines:
+            if line.startswith('Time:'):
+                try:
+                    time_str = line.split(':', 1)[1].strip().split()[0]
+                    time_estimate = float(time_str)
+
+                    normalized_lines.append(f"Time: {int(time_estimate) if time_estimate.is_integer() else time_estimate} hours")
+                except (ValueError, IndexError):
+                    normalized_lines.append(line)
+            elif line.startswith('Priority:'):
+                priority_str = line.split(':', 1)[1].strip()
+                if priority_str in ['High', 'Medium', 'Low']:
+                    suggested_priority = priority_str
+                    normalized_lines.append(line)
+                else:
+                    normalized_lines.append(line)
+            elif line.startswith('Confidence:'):
+                try:
+                    confidence_str = line.split(':', 1)[1].strip().split()[0]
+                    confidence_val = int(confidence_str)
+
+                    ai_confidence = max(1, min(5, confidence_val))
+                except (ValueError, IndexError):
+                    pass
+            elif line.startswith('ConfidenceReason:'):
+                ai_confidence_explanation = line.split(':', 1)[1].strip()
+
+            else:
+                normalized_lines.append(line)
+
+        normalized_response = '\n'.join(normalized_lines)
+        return normalized_response, time_estimate, suggested_priority, ai_confidence, ai_confidence_explanation
+
+    @staticmethod
+    def _parsed_fields(text):
+        return {match.group(1) for match in ASSIGNMENT_FIELD_LINE.finditer(text)}
+
+    def _cached_result(self, assignment_title, clean_description, college_name):
+        if self.cache is None:
+            return None, None
+        cache_key = self._cache_key(assignment_title, clean_description, college_name)
+        return cache_key, self.cache.get_cached_ai_result(cache_key)
+
+    def enhance_assignment(self, assignment_title, assignment_description="", course_name="", college_name="", on_progress=None):
         if not self.model:
             return "", None, None, None, None
 
         try:
-            if assignment_description:
-                clean_description = re.sub(r'<[^>]+>', '', assignment_description)
-                clean_description = html.unescape(clean_description)
-                clean_description = ' '.join(clean_description.split())
-            else:
-                clean_description = "No description provided"
+            clean_description = self._clean_description(assignment_description)
+
+            cache_key, cached = self._cached_result(assignment_title, clean_description, college_name)
+            if cached:
+                return cached
 
             prompt = self.assignment_prompt_template.format(
                 college_name=college_name,
@@ -601,52 +1487,30 @@ class AIEnhancer:
                 clean_description=clean_description
             )
 
+            parsed_count = 0
+
+            def on_text(text):
+                nonlocal parsed_count
+                fields = self._parsed_fields(text)
+                if on_progress and len(fields) > parsed_count:
+                    on_progress(len(fields), len(ASSIGNMENT_RESPONSE_FIELDS))
+                parsed_count = len(fields)
+
             if self.model == "ollama":
-                ai_response = self._call_ollama(prompt)
+                ai_response = self._call_ollama(
+                    prompt,
+                    on_text=on_text,
+                    stop_when=lambda text: len(self._parsed_fields(text)) == len(ASSIGNMENT_RESPONSE_FIELDS)
+                )
             else:
                 print("  WARNING: Ollama not available. Skipping AI analysis.")
                 return "", None, None, None, None
 
-            if self._validate_ai_response(ai_response):
-                time_estimate = None
-                suggested_priority = None
-                ai_confidence = None
-                ai_confidence_explanation = None
-
-                normalized_lines = []
-                lines = ai_response.split('\n')
-                for line in lines:
-                    if line.startswith('Time:'):
-                        try:
-                            time_str = line.split(':', 1)[1].strip().split()[0]
-                            time_estimate = float(time_str)
-
-                            normalized_lines.append(f"Time: {int(time_estimate) if time_estimate.is_integer() else time_estimate} hours")
-                        except (ValueError, IndexError):
-                            normalized_lines.append(line)
-                    elif line.startswith('Priority:'):
-                        priority_str = line.split(':', 1)[1].strip()
-                        if priority_str in ['High', 'Medium', 'Low']:
-                            suggested_priority = priority_str
-                            normalized_lines.append(line)
-                        else:
-                            normalized_lines.append(line)
-                    elif line.startswith('Confidence:'):
-                        try:
-                            confidence_str = line.split(':', 1)[1].strip().split()[0]
-                            confidence_val = int(confidence_str)
-
-                            ai_confidence = max(1, min(5, confidence_val))
-                        except (ValueError, IndexError):
-                            pass
-                    elif line.startswith('ConfidenceReason:'):
-                        ai_confidence_explanation = line.split(':', 1)[1].strip()
-
-                    else:
-                        normalized_lines.append(line)
-
-                normalized_response = '\n'.join(normalized_lines)
-                return normalized_response, time_estimate, suggested_priority, ai_confidence, ai_confidence_explanation
+            result = self._parse_assignment_response(ai_response)
+            if result:
+                if cache_key:
+                    self.cache.save_cached_ai_result(cache_key, result, self.cache_max_entries)
+                return result
             else:
                 print(f"  WARNING: AI response format invalid for '{assignment_title[:50]}'. Skipping AI notes.")
                 return "", None, None, None, None
@@ -660,6 +1524,139 @@ class AIEnhancer:
                 print("  Suggestion: Make sure Ollama is running (ollama serve).")
             return "", None, None, None, None
 
+    @staticmethod
+    def _split_batch_response(ai_response):
+        parsed = parse_json_response(ai_response)
+        if isinstance(parsed, dict):
+            parsed = parsed.get("assignments", [])
+        if not isinstance(parsed, list):
+            return {}
+
+        return {str(item.get("id")): item for item in parsed if isinstance(item, dict) and item.get("id") is not None}
+
+    @staticmethod
+    def _batch_item_text(item):
+        lines = [
+            f"Time: {item.get('time')}",
+            f"Priority: {item.get('priority')}",
+            f"Difficulty: {item.get('difficulty')}",
+            f"Notes: {item.get('notes')}",
+            "",
+            f"Confidence: {item.get('confidence')}",
+            f"ConfidenceReason: {item.get('confidence_reason')}"
+        ]
+        return '\n'.join(line for line in lines if not line.endswith(': None'))
+
+    def _enhance_batch(self, jobs):
+        """Return {key: result} for the jobs one batch prompt answered validly."""
+        items = []
+        for index, (key, title, description, course_name, college_name) in enumerate(jobs):
+            items.append({"id": str(index + 1), "title": title, "description": self._clean_description(description)})
+
+        prompt = self.batch_prompt_template.format(
+            college_name=jobs[0][4],
+            assignments_json=json.dumps(items, indent=2)
+        )
+        parsed = self._split_batch_response(self._call_ollama(prompt, json_mode=True))
+
+        results = {}
+        for item, job in zip(items, jobs):
+            response_item = parsed.get(item["id"])
+            result = self._parse_assignment_response(self._batch_item_text(response_item)) if response_item else None
+            if result:
+                results[job[0]] = result
+                if self.cache is not None:
+                    cache_key = self._cache_key(item["title"], item["description"], job[4])
+                    self.cache.save_cached_ai_result(cache_key, result, self.cache_max_entries)
+        return results
+
+    def stream_enhancements(self, jobs, stop=None):
+        """Yield 'partial' and 'done' events for (key, title, description, course_name, college_name) jobs."""
+        events = queue.Queue()
+
+        def run(job):
+            key = job[0]
+            start = time.perf_counter()
+
+            def on_progress(fields, total):
+                events.put({'type': 'partial', 'key': key, 'fields': fields, 'total': total})
+
+            try:
+                result = dict(zip(AI_RESULT_FIELDS, self.enhance_assignment(*job[1:], on_progress=on_progress)))
+            except Exception as e:
+                print(f"  WARNING: AI worker failed: {e}")
+                result = dict.fromkeys(AI_RESULT_FIELDS)
+                result['ai_notes'] = ""
+            events.put({'type': 'done', 'key': key, 'result': result, 'elapsed': time.perf_counter() - start})
+
+        def run_batch(batch):
+            start = time.perf_counter()
+            try:
+                results = self._enhance_batch(batch)
+            except Exception as e:
+                print(f"  WARNING: AI batch of {len(batch)} failed ({self._classify_error(e)}). Retrying one at a time.")
+                results = {}
+
+            elapsed = time.perf_counter() - start
+            for job in batch:
+                if job[0] in results:
+                    events.put({'type': 'done', 'key': job[0], 'result': dict(zip(AI_RESULT_FIELDS, results[job[0]])), 'elapsed': elapsed})
+                else:
+                    run(job)
+
+        jobs = list(jobs)
+        futures = []
+        if self.batch_size > 1 and self.model:
+            pending = {}
+            for job in jobs:
+                key, title, description, course_name, college_name = job
+                _, cached = self._cached_result(title, self._clean_description(description), college_name)
+                if cached:
+                    events.put({'type': 'done', 'key': key, 'result': dict(zip(AI_RESULT_FIELDS, cached)), 'elapsed': 0.0})
+                else:
+                    pending.setdefault(college_name, []).append(job)
+
+            for college_jobs in pending.values():
+                for i in range(0, len(college_jobs), self.batch_size):
+                    futures.append(self._executor.submit(run_batch, college_jobs[i:i + self.batch_size]))
+        else:
+            for job in jobs:
+                futures.append(self._executor.submit(run, job))
+
+        remaining = len(jobs)
+        try:
+            while remaining:
+                if stop is None:
+                    event = events.get()
+                else:
+                    try:
+                        event = events.get(timeout=0.1)
+                    except queue.Empty:
+                        if stop.is_set():
+                            return
+                        continue
+                if event['type'] == 'done':
+                    remaining -= 1
+                yield event
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def enhance_assignments(self, jobs):
+        """Like stream_enhancements, but yields only (key, result, elapsed) per finished job."""
+        for event in self.stream_enhancements(jobs):
+            if event['type'] == 'done':
+                yield event['key'], event['result'], event['elapsed']
+
+    def estimated_latency(self, default=3.5):
+        with self._timings_lock:
+            return sum(self._timings) / len(self._timings) if self._timings else default
+
+    def estimate_batch_time(self, count):
+        calls = -(-count // self.batch_size)
+        waves = -(-calls // self.num_parallel)
+        return waves * self.estimated_latency()
+
     def _validate_ai_response(self, response):
         if not response or len(response) < 10:
             return False
@@ -673,20 +1670,65 @@ class AIEnhancer:
 
         return True
 
-    def _call_ollama(self, prompt):
+    def _call_ollama(self, prompt, on_text=None, stop_when=None, json_mode=False):
+        """Return the response text; stop_when ends a streamed generation early."""
         try:
             timeout = 120
+            stream = on_text is not None or stop_when is not None
 
             payload = {
                 "model": self.ollama_model,
                 "prompt": prompt,
-                "stream": False
+                "stream": stream,
+                "keep_alive": self.keep_alive
             }
-            response = requests.post(self.ollama_url, json=payload, timeout=timeout)
-            response.raise_for_status()
-            result = response.json()
-            return result.get("response", "").strip()
-        except requests.exceptions.Timeout as e:
+            if json_mode:
+                payload["format"] = "json"
+            start = time.perf_counter()
+
+            if not stream:
+                response = self.session.post(self.ollama_url, json=payload, timeout=timeout)
+                response.raise_for_status()
+                final_chunk = response.json()
+                text = final_chunk.get("response", "")
+                chunk_count = 0
+            else:
+                text = ""
+                final_chunk = {}
+                chunk_count = 0
+                with self.session.post(self.ollama_url, json=payload, timeout=timeout, stream=True) as response:
+                    response.raise_for_status()
+                    for line in response.iter_lines():
+                        if not line:
+                            continue
+                        chunk = json.loads(line)
+                        if chunk.get("error"):
+                            raise requests.exceptions.RequestException(chunk["error"])
+
+                        if not text and chunk.get("response"):
+                            with self._timings_lock:
+                                self._first_token_timings.append(time.perf_counter() - start)
+                                if self.first_token_time is None:
+                                    self.first_token_time = self._first_token_timings[-1]
+                        text += chunk.get("response", "")
+                        chunk_count += bool(chunk.get("response"))
+                        if on_text:
+                            on_text(text)
+                        if chunk.get("done"):
+                            final_chunk = chunk
+                            break
+                        if stop_when and stop_when(text):
+                            break
+                        if time.perf_counter() - start > timeout:
+                            raise requests.exceptions.Timeout()
+
+            with self._timings_lock:
+                self._timings.append(time.perf_counter() - start)
+                self.token_counts['calls'] += 1
+                self.token_counts['prompt_tokens'] += final_chunk.get("prompt_eval_count", 0)
+                self.token_counts['generated_tokens'] += final_chunk.get("eval_count", chunk_count)
+            return text.strip()
+        except requests.exceptions.Timeout:
             raise Exception(f"Ollama API timeout after {timeout}s - model may be too slow.")
         except requests.exceptions.RequestException as e:
             raise Exception(f"Ollama API error: {str(e)}")
@@ -702,7 +1744,74 @@ class AIEnhancer:
         else:
             return "Unknown error"
 
-    def generate_comprehensive_insights(self, assignments_data, college_name, end_date):
+    @staticmethod
+    def _due_sort_key(item):
+        try:
+            return datetime.strptime(item['due_date'], "%m-%d-%Y"), item['title']
+        except (ValueError, TypeError):
+            return datetime.max, item['title']
+
+    def _insights_chunks(self, assignments_summary, group_by="course"):
+        """Return (label, items) chunks of at most insights_chunk_size, grouped by course or due week."""
+        groups = {}
+        for item in sorted(assignments_summary, key=self._due_sort_key):
+            if group_by == "week":
+                due = self._due_sort_key(item)[0]
+                label = f"Week of {(due - timedelta(days=due.weekday())).strftime('%m-%d-%Y')}" if due != datetime.max else "No due date"
+            else:
+                label = item['course'] or "Other"
+            groups.setdefault(label, []).append(item)
+
+        chunks = []
+        for label, items in groups.items():
+            parts = [items[i:i + self.insights_chunk_size] for i in range(0, len(items), self.insights_chunk_size)]
+            for index, part in enumerate(parts):
+                chunks.append((f"{label} (part {index + 1} of {len(parts)})" if len(parts) > 1 else label, part))
+        return chunks
+
+    def _summarize_insights_chunk(self, group_label, items, college_name, today, end_date_formatted):
+        hours = [item['time_estimate'] for item in items if isinstance(item['time_estimate'], (int, float))]
+        summary = {
+            'group': group_label,
+            'assignment_count': len(items),
+            'estimated_hours': round(sum(hours), 1),
+            'due_range': f"{items[0]['due_date']} to {items[-1]['due_date']}",
+        }
+
+        assignments_json = json.dumps(items)
+        key_parts = [self.ollama_model, self.insights_chunk_prompt_version, college_name, today,
+                     end_date_formatted, group_label, assignments_json]
+        cache_key = hashlib.sha256(json.dumps(key_parts).encode('utf-8')).hexdigest()
+        cached = self.cache.get_cached_insights_summary(cache_key) if self.cache is not None else None
+        if cached:
+            return cached
+
+        try:
+            prompt = self.insights_chunk_prompt_template.format(
+                college_name=college_name,
+                today=today,
+                end_date_formatted=end_date_formatted,
+                group_label=group_label,
+                assignments_json=assignments_json
+            )
+            parsed = parse_json_response(self._call_ollama(prompt, json_mode=True))
+        except Exception as e:
+            print(f"Error summarizing insights for {group_label}: {e}")
+            parsed = None
+
+        if not isinstance(parsed, dict) or not parsed.get('summary'):
+            summary['summary'] = '; '.join(
+                f"{item['title']} due {item['due_date']} ({item['priority']}, {item['status']})" for item in items
+            )
+            return summary
+
+        summary['summary'] = parsed['summary']
+        summary['busiest_dates'] = parsed.get('busiest_dates') or []
+        if self.cache is not None:
+            self.cache.save_cached_insights_summary(cache_key, summary, self.cache_max_entries)
+        return summary
+
+    def generate_comprehensive_insights(self, assignments_data, college_name, end_date, group_by="course"):
         if not self.model:
             return None
 
@@ -732,69 +1841,43 @@ class AIEnhancer:
                     'priority': assignment.get('priority', 'Medium'),
                     'status': assignment.get('status', 'Not Started'),
                     'ai_notes': assignment.get('ai_notes', ''),
-                    'description': assignment.get('description', '')[:200]
+                    'description': html_to_text(assignment.get('description', ''), max_chars=200)
                 })
 
-            assignments_json = json.dumps(assignments_summary, indent=2)
-            
-            prompt = self.insights_prompt_template.format(
-                college_name=college_name,
-                today=today,
-                end_date_formatted=end_date_formatted,
-                assignments_json=assignments_json
-            )
-
-            if self.model == "ollama":
-                ai_response = self._call_ollama(prompt)
-            else:
+            if self.model != "ollama":
                 print("  WARNING: Ollama not available. Skipping comprehensive insights.")
                 return None
 
-            json_match = re.search(r'\{.*\}', ai_response, re.DOTALL)
-            json_str = json_match.group() if json_match else ai_response
-            
-            json_str = json_str.strip()
-            
-            def clean_json_string(s):
-                result = []
-                in_string = False
-                escape_count = 0
-                i = 0
-                while i < len(s):
-                    char = s[i]
-                    if char == '\\':
-                        escape_count += 1
-                        result.append(char)
-                    elif char == '"':
-                        if escape_count % 2 == 0:
-                            in_string = not in_string
-                        result.append(char)
-                        escape_count = 0
-                    elif in_string and ord(char) < 32:
-                        if char == '\n':
-                            result.append('\\n')
-                        elif char == '\r':
-                            result.append('\\r')
-                        elif char == '\t':
-                            result.append('\\t')
-                        else:
-                            pass
-                        escape_count = 0
-                    else:
-                        result.append(char)
-                        escape_count = 0
-                    i += 1
-                return ''.join(result)
-            
-            json_str = clean_json_string(json_str)
-            
-            try:
-                insights = json.loads(json_str)
-                return insights
-            except json.JSONDecodeError as e:
-                print(f"JSON decode error: {e}")
-                print(f"JSON string (first 500 chars): {json_str[:500]}")
+            if len(assignments_summary) > self.insights_chunk_size:
+                chunks = self._insights_chunks(assignments_summary, group_by)
+                summaries = list(self._executor.map(
+                    lambda chunk: self._summarize_insights_chunk(*chunk, college_name, today, end_date_formatted),
+                    chunks
+                ))
+                prompt = self.insights_reduce_prompt_template.format(
+                    college_name=college_name,
+                    today=today,
+                    end_date_formatted=end_date_formatted,
+                    summaries_json=json.dumps(summaries, indent=2)
+                )
+            else:
+                assignments_json = json.dumps(assignments_summary, indent=2)
+
+                prompt = self.insights_prompt_template.format(
+                    college_name=college_name,
+                    today=today,
+                    end_date_formatted=end_date_formatted,
+                    assignments_json=assignments_json
+                )
+
+            ai_response = self._call_ollama(prompt, json_mode=True)
+
+            insights = parse_json_response(ai_response)
+            if not isinstance(insights, dict):
+                print("JSON decode error: no JSON object in insights response")
+                print(f"Response (first 500 chars): {ai_response[:500]}")
                 return None
+            return insights
 
         except Exception as e:
             print(f"Error generating comprehensive insights: {e}")
@@ -839,38 +1922,314 @@ class RemindersManager:
         '''
         RemindersManager.run_applescript(script)
 
-class CanvasAPI:
-    def __init__(self, api_token, canvas_domain):
-        self.headers = {"Authorization": f"Bearer {api_token}"}
-        self.base_url = f"https://{canvas_domain}/api/v1"
+CANVAS_MAX_PER_PAGE = 100
+
+CANVAS_MAX_CONCURRENCY = 12
 
-    def fetch_course_assignments(self, course_id):
+CANVAS_RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class CanvasAPIError(Exception):
+    def __init__(self, message, status_code=None):
+        super().__init__(message)
+        self.status_code = status_code
+
+class CanvasRateLimiter:
+    """AIMD cap on Canvas requests in flight."""
+
+    def __init__(self, max_concurrency, low_water=150):
+        self.max_concurrency = max_concurrency
+        self.low_water = low_water
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self.remaining = None
+        self.request_cost = None
+        self._condition = threading.Condition()
+
+    @contextmanager
+    def slot(self):
+        with self._condition:
+            while self.in_flight >= max(1, int(self.limit)):
+                self._condition.wait()
+            self.in_flight += 1
         try:
-            params = {"include[]": ["submission", "description"], "per_page": 50}
-            response = requests.get(f"{self.base_url}/courses/{course_id}/assignments", headers=self.headers, params=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException:
-            return []
+            yield
+        finally:
+            with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
 
-    def fetch_course_discussions(self, course_id):
+    @staticmethod
+    def _header_float(response, name):
         try:
-            params = {"per_page": 50}
-            response = requests.get(f"{self.base_url}/courses/{course_id}/discussion_topics", headers=self.headers, params=params)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException:
-            return []
+            return float(response.headers[name])
+        except (KeyError, ValueError):
+            return None
+
+    def record(self, response, throttled=False):
+        remaining = self._header_float(response, "X-Rate-Limit-Remaining")
+        request_cost = self._header_float(response, "X-Request-Cost")
+
+        with self._condition:
+            if remaining is not None:
+                self.remaining = remaining
+            if request_cost is not None:
+                self.request_cost = request_cost
+
+            reserve = self.low_water + (self.request_cost or 0) * self.in_flight
+            if throttled or (remaining is not None and remaining < reserve):
+                self.limit = max(1.0, self.limit / 2)
+            else:
+                self.limit = min(float(self.max_concurrency), self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+class CanvasAPI:
+    def __init__(self, api_token, canvas_domain, max_concurrency=CANVAS_MAX_CONCURRENCY, base_url=None, per_page=CANVAS_MAX_PER_PAGE,
+                 max_retries=4, backoff_base=0.5, backoff_max=30, timeout=30,
+                 cache=None, cache_ttl=300, cache_max_bytes=32 * 1024 * 1024):
+        self.headers = {"Authorization": f"Bearer {api_token}"}
+        self.base_url = base_url or f"https://{canvas_domain}/api/v1"
+        self.max_concurrency = max_concurrency
+        self.per_page = max(1, min(per_page, CANVAS_MAX_PER_PAGE))
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.rate_limiter = CanvasRateLimiter(max_concurrency)
+
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.cache_max_bytes = cache_max_bytes
+        self._cache_namespace = hashlib.sha256(api_token.encode()).hexdigest()
+
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+    @staticmethod
+    def _is_throttled(response):
+        # Canvas throttles with 403 "Rate Limit Exceeded" as well as 429.
+        if response.status_code == 429:
+            return True
+        return response.status_code == 403 and "rate limit exceeded" in response.text.lower()
+
+    def _backoff(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(self.backoff_max, float(retry_after))
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _request(self, url, params=None, headers=None):
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                with self.rate_limiter.slot():
+                    response = self.session.get(url, params=params, headers=headers, timeout=self.timeout)
+                    throttled = self._is_throttled(response)
+                    self.rate_limiter.record(response, throttled)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = CanvasAPIError(f"Canvas request failed: {e}")
+            else:
+                if response.ok:
+                    return response
 
-    def get_course_items(self, course_id):
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            assignments_future = executor.submit(self.fetch_course_assignments, course_id)
-            discussions_future = executor.submit(self.fetch_course_discussions, course_id)
+                error = CanvasAPIError(f"Canvas API returned {response.status_code} for {url}", response.status_code)
+                if not throttled and response.status_code not in CANVAS_RETRY_STATUSES:
+                    raise error
 
-            assignments = assignments_future.result()
-            discussions = discussions_future.result()
+            if attempt < self.max_retries:
+                time.sleep(self._backoff(attempt, response))
 
-        return assignments + discussions
+        raise error
+
+    def _get_page(self, url, params=None, max_age=None):
+        """Return (items, next_url), serving cached pages younger than max_age and revalidating older ones."""
+        if self.cache is None:
+            response = self._request(url, params)
+            return response.json(), response.links.get("next", {}).get("url")
+
+        url = requests.Request("GET", url, params=params).prepare().url
+        cache_key = hashlib.sha256(f"{self._cache_namespace}\n{url}".encode()).hexdigest()
+        entry = self.cache.get_cached_response(cache_key)
+
+        max_age = self.cache_ttl if max_age is None else max_age
+        if entry and time.time() - entry['fetched_at'] < max_age:
+            return json.loads(entry['body']), entry['next_url']
+
+        headers = {"If-None-Match": entry['etag']} if entry and entry['etag'] else None
+        response = self._request(url, headers=headers)
+
+        if response.status_code == 304 and entry:
+            body, etag, next_url = entry['body'], entry['etag'], entry['next_url']
+        else:
+            body, etag, next_url = response.text, response.headers.get("ETag"), response.links.get("next", {}).get("url")
+
+        self.cache.save_cached_response(cache_key, url, etag, body, next_url, self.cache_max_bytes)
+        return json.loads(body), next_url
+
+    def iter_pages(self, path, params=None, max_age=None):
+        """Yield items from every page of a Canvas list endpoint, prefetching the next page."""
+        params = {**(params or {}), "per_page": self.per_page}
+        future = self._executor.submit(self._get_page, f"{self.base_url}{path}", params, max_age)
+        while future:
+            items, next_url = future.result()
+            future = self._executor.submit(self._get_page, next_url, None, max_age) if next_url else None
+            yield from items
+
+    async def _fetch_listing_async(self, path, params, semaphore, max_age=None):
+        loop = asyncio.get_running_loop()
+        url, params = f"{self.base_url}{path}", {**params, "per_page": self.per_page}
+        items = []
+        while url:
+            async with semaphore:
+                page, url = await loop.run_in_executor(self._executor, self._get_page, url, params, max_age)
+            items.extend(page)
+            params = None
+        return items
+
+    def _course_listings(self, course_id, bucket=None):
+        assignment_params = {"include[]": ["submission", "description"]}
+        if bucket:
+            assignment_params["bucket"] = bucket
+        return [
+            (f"/courses/{course_id}/assignments", assignment_params),
+            (f"/courses/{course_id}/discussion_topics", {}),
+        ]
+
+    async def fetch_courses_items_async(self, course_ids, bucket=None, max_age=0):
+        """Return {course_id: items}, or the CanvasAPIError a course raised in place of its items."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def course_items(course_id):
+            listings = await asyncio.gather(*(
+                self._fetch_listing_async(path, params, semaphore, max_age)
+                for path, params in self._course_listings(course_id, bucket)
+            ))
+            return [item for listing in listings for item in listing]
+
+        results = await asyncio.gather(*(course_items(course_id) for course_id in course_ids), return_exceptions=True)
+        return dict(zip(course_ids, results))
+
+    def get_courses_items(self, course_ids, bucket=None, max_age=0):
+        return asyncio.run(self.fetch_courses_items_async(list(course_ids), bucket, max_age))
+
+    def fetch_favorite_courses(self):
+        return list(self.iter_pages("/users/self/favorites/courses"))
+
+class CourseCatalog:
+    def __init__(self, db, canvas_api, ttl=60):
+        self.db = db
+        self.canvas_api = canvas_api
+        self.ttl = ttl
+        self._cached = None
+        self._lock = threading.Lock()
+
+    def get_courses(self, refresh=False):
+        """Return favorited courses merged with local ones; enabled courses no longer favorited have id None."""
+        version = self.db.get_data_version()
+        with self._lock:
+            if not refresh and self._cached:
+                cached_version, cached_at, courses = self._cached
+                if cached_version == version and time.time() - cached_at < self.ttl:
+                    return [dict(course) for course in courses]
+
+        favorites = self.canvas_api.fetch_favorite_courses()
+        mappings = self.db.get_all_course_mappings()
+
+        courses = []
+        for course in favorites:
+            course_name = course.get("name", "Unnamed Course")
+            reminder_list, enabled = mappings.get(course_name, (None, None))
+            courses.append({
+                'id': course.get("id"),
+                'name': course_name,
+                'reminder_list': reminder_list or '',
+                'enabled': enabled,
+                'favorite': True
+            })
+
+        favorite_names = {course['name'] for course in courses}
+        for course_name, (reminder_list, enabled) in mappings.items():
+            if enabled == 1 and course_name not in favorite_names:
+                courses.append({
+                    'id': None,
+                    'name': course_name,
+                    'reminder_list': reminder_list or '',
+                    'enabled': enabled,
+                    'favorite': False
+                })
+
+        with self._lock:
+            self._cached = (version, time.time(), courses)
+        return [dict(course) for course in courses]
+
+    def get_sync_courses(self):
+        return [
+            course for course in self.get_courses()
+            if course['favorite'] and course['id'] and course['enabled'] != 0 and course['reminder_list'].strip()
+        ]
+
+class AIJobQueue:
+    def __init__(self, db, ai_enhancer, max_attempts=3):
+        self.db = db
+        self.ai_enhancer = ai_enhancer
+        self.max_attempts = max_attempts
+        self._background = None
+        self._background_stop = None
+        self._lock = threading.Lock()
+
+    def enqueue(self, jobs):
+        self.db.enqueue_ai_jobs(jobs)
+
+    def drain(self, stop=None):
+        """Yield stream events for queued jobs, soonest due first; unfinished claims are released when it stops."""
+        chunk_size = self.ai_enhancer.num_parallel * self.ai_enhancer.batch_size * 2
+        while not (stop and stop.is_set()):
+            claimed = self.db.claim_ai_jobs(chunk_size)
+            if not claimed:
+                return
+
+            attempts = {job[0]: job[5] for job in claimed}
+            events = self.ai_enhancer.stream_enhancements((job[:5] for job in claimed), stop=stop)
+            try:
+                for event in events:
+                    if event['type'] == 'done':
+                        assignment_id = event['key']
+                        result = event['result']
+                        if result['ai_notes']:
+                            self.db.apply_ai_result(assignment_id, result)
+                            self.db.finish_ai_job(assignment_id)
+                        else:
+                            self.db.finish_ai_job(assignment_id, retry=attempts[assignment_id] < self.max_attempts)
+                        del attempts[assignment_id]
+                    yield event
+            finally:
+                events.close()
+                if attempts:
+                    self.db.release_ai_jobs(attempts)
+
+    def start_background(self):
+        with self._lock:
+            if self._background and self._background.is_alive():
+                return
+            self._background_stop = threading.Event()
+            self._background = threading.Thread(target=lambda stop: list(self.drain(stop)), args=(self._background_stop,), daemon=True)
+            self._background.start()
+
+    def stop_background(self):
+        """Stop a background drain and wait until it has released its claimed jobs."""
+        with self._lock:
+            background = self._background
+            if not background:
+                return
+            self._background_stop.set()
+        background.join()
 
 class AssignmentProcessor:
     def __init__(self, db, ai_enhancer, reminders_manager):
@@ -878,6 +2237,41 @@ class AssignmentProcessor:
         self.ai_enhancer = ai_enhancer
         self.reminders_manager = reminders_manager
 
+    @staticmethod
+    def item_type(item):
+        return "discussion" if "discussion_type" in item else "assignment"
+
+    @staticmethod
+    def item_updated_at(item):
+        return item.get("updated_at") or (item.get("assignment") or {}).get("updated_at")
+
+    def is_before_watermark(self, item, watermarks):
+        watermark = watermarks.get(self.item_type(item))
+        updated_at = self.item_updated_at(item)
+        return bool(watermark and updated_at and updated_at <= watermark)
+
+    def filter_changed_items(self, items, watermarks=None):
+        """Return the items changed since the watermarks, and the advanced watermarks."""
+        watermarks = watermarks or {}
+        advanced = dict(watermarks)
+        changed = []
+
+        unchanged = [item for item in items if self.is_before_watermark(item, watermarks)]
+        stored_ids = self.db.get_existing_assignment_ids(str(item.get("id")) for item in unchanged) if unchanged else set()
+
+        for item in items:
+            item_type = self.item_type(item)
+            updated_at = self.item_updated_at(item)
+
+            if str(item.get("id")) in stored_ids and self.is_before_watermark(item, watermarks):
+                continue
+
+            changed.append(item)
+            if updated_at and updated_at > (advanced.get(item_type) or ""):
+                advanced[item_type] = updated_at
+
+        return changed, advanced
+
     def should_process_assignment(self, item, now):
         title = item.get("name") or item.get("title", "No Title")
         assignment_id = str(item.get("id"))
@@ -910,7 +2304,7 @@ class AssignmentProcessor:
             return False, None
 
         existing = self.db.get_assignment(assignment_id)
-        if existing and existing[4] == due_at:
+        if existing and existing.due_at == due_at:
             return False, None
 
         return True, {
@@ -922,46 +2316,41 @@ class AssignmentProcessor:
             "description": item.get("description", "")
         }
 
-    def process_assignment(self, assignment_data, reminder_list, course_name, college_name, ai_summary_enabled=True):
-        if not assignment_data:
-            return
-
+    def build_assignment_row(self, assignment_data, reminder_list, course_name, college_name, ai_summary_enabled=True, ai_result=None):
         title = assignment_data["title"]
         assignment_id = assignment_data["assignment_id"]
-        due_at = assignment_data["due_at"]
         description = assignment_data.get("description", "")
 
-        existing = self.db.get_assignment(assignment_id)
+        row = {
+            'assignment_id': assignment_id,
+            'title': title,
+            'description': description,
+            'due_at': assignment_data["due_at"],
+            'course_name': course_name,
+            'reminder_list': reminder_list,
+            'ai_notes': "",
+            'time_estimate': None,
+            'suggested_priority': None,
+            'ai_confidence': None,
+            'ai_confidence_explanation': None
+        }
 
-        ai_notes = ""
-        time_estimate = None
-        suggested_priority = None
-        ai_confidence = None
-        ai_confidence_explanation = None
+        if ai_result is not None:
+            for field in AI_RESULT_FIELDS:
+                row[field] = ai_result[field]
+        elif self.ai_enhancer and self.ai_enhancer.model and ai_summary_enabled:
+            existing = self.db.get_assignment(assignment_id)
+            if existing and existing.ai_notes and existing.ai_notes.strip():
+                row['ai_notes'] = existing.ai_notes
+            else:
+                (row['ai_notes'], row['time_estimate'], row['suggested_priority'],
+                 row['ai_confidence'], row['ai_confidence_explanation']) = self.ai_enhancer.enhance_assignment(title, description, course_name, college_name)
 
-        if self.ai_enhancer and self.ai_enhancer.model and ai_summary_enabled:
-            if existing and len(existing) > 7 and existing[7] and existing[7].strip():
-                ai_notes = existing[7]
+        return row
 
-                if existing and len(existing) > 16:
-                    time_estimate = existing[16] if existing[16] else None
-                    suggested_priority = existing[17] if len(existing) > 17 and existing[17] else None
-                    ai_confidence = existing[18] if len(existing) > 18 and existing[18] else None
-                    ai_confidence_explanation = existing[19] if len(existing) > 19 and existing[19] else None
-            else:
-                ai_notes, time_estimate, suggested_priority, ai_confidence, ai_confidence_explanation = self.ai_enhancer.enhance_assignment(title, description, course_name, college_name)
-
-        self.db.save_assignment(assignment_id, title, description, due_at, course_name, reminder_list, ai_notes)
-
-        if time_estimate is not None or suggested_priority is not None or ai_confidence is not None or ai_confidence_explanation is not None:
-            update_fields = {}
-            if time_estimate is not None:
-                update_fields['time_estimate'] = time_estimate
-            if suggested_priority is not None:
-                update_fields['suggested_priority'] = suggested_priority
-            if ai_confidence is not None:
-                update_fields['ai_confidence'] = ai_confidence
-            if ai_confidence_explanation is not None:
-                update_fields['ai_confidence_explanation'] = ai_confidence_explanation
-            if update_fields:
-                self.db.update_assignment_fields(assignment_id, **update_fields)
+    def process_assignment(self, assignment_data, reminder_list, course_name, college_name, ai_summary_enabled=True):
+        if not assignment_data:
+            return
+
+        row = self.build_assignment_row(assignment_data, reminder_list, course_name, college_name, ai_summary_enabled)
+        self.db.save_assignments_bulk([row])
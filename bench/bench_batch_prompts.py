@@ -0,0 +1,155 @@
+"""
+Compare batched assignment prompts against one prompt per assignment.
+
+Runs the same synthetic assignments through AIEnhancer once with
+batch_size=1 and once per requested batch size, and reports wall time,
+prompt and generated tokens (from Ollama's prompt_eval_count/eval_count)
+and generated tokens per second. Single-item calls stream and stop as soon
+as every field has arrived, so Ollama never sends their final counts:
+their prompt tokens show as 0 and generated tokens are the streamed chunks.
+
+    python3 bench/bench_batch_prompts.py --model llama3.1 --count 24 --batch-sizes 4 8
+    python3 bench/bench_batch_prompts.py --stand-in
+
+--stand-in starts a local fake Ollama that charges a fixed time per prompt
+token and per generated token, so the script can be checked without a
+model. Its numbers only show the shape of the trade-off; run against a
+real model before changing OLLAMA_BATCH_SIZE.
+"""
+
+import argparse
+import json
+import re
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend import AIEnhancer
+
+STAND_IN_PROMPT_TOKENS_PER_SECOND = 2000
+STAND_IN_GENERATED_TOKENS_PER_SECOND = 60
+SINGLE_RESPONSE = ("Time: 3 hours\nPriority: Medium\nDifficulty: Medium\n"
+                   "Notes: Work through the problem set and check answers against the lecture notes.\n\n"
+                   "Confidence: 3\nConfidenceReason: The description lists the required problems.\n")
+
+
+class StandInOllama(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._send_json({"models": []})
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt = request.get("prompt", "")
+        if not prompt:
+            self._send_json({"response": "", "done": True})
+            return
+
+        prompt_tokens = len(prompt) // 4
+        if request.get("format") == "json":
+            ids = re.findall(r'"id": "(\d+)"', prompt)
+            response = json.dumps({"assignments": [{
+                "id": item_id, "time": 3, "priority": "Medium", "difficulty": "Medium",
+                "notes": "Work through the problem set and check answers against the lecture notes.",
+                "confidence": 3, "confidence_reason": "The description lists the required problems."
+            } for item_id in ids]})
+        else:
+            response = SINGLE_RESPONSE
+        tokens = re.findall(r'\S+\s*|\s+', response)
+        time.sleep(prompt_tokens / STAND_IN_PROMPT_TOKENS_PER_SECOND)
+
+        if not request.get("stream"):
+            time.sleep(len(tokens) / STAND_IN_GENERATED_TOKENS_PER_SECOND)
+            self._send_json({"response": response, "done": True,
+                             "prompt_eval_count": prompt_tokens, "eval_count": len(tokens)})
+            return
+
+        self.send_response(200)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            for token in tokens:
+                time.sleep(1 / STAND_IN_GENERATED_TOKENS_PER_SECOND)
+                self._write_chunk({"response": token, "done": False})
+            self._write_chunk({"response": "", "done": True,
+                               "prompt_eval_count": prompt_tokens, "eval_count": len(tokens)})
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _write_chunk(self, payload):
+        line = (json.dumps(payload) + "\n").encode()
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stand_in():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInOllama)
+    # Streamed single-item calls hang up once every field has arrived; that is expected, not an error.
+    server.handle_error = lambda request, client_address: None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def make_jobs(count):
+    description = ("<p>Complete problems {n} through {m} from chapter {c}. Show all work, "
+                   "explain each step and submit a single PDF.</p>")
+    return [(str(i), f"Problem Set {i}", description.format(n=i, m=i + 10, c=i % 12 + 1), "MATH 201", "State University")
+            for i in range(count)]
+
+
+def run(model, host, jobs, batch_size, num_parallel):
+    ai = AIEnhancer(ollama_model=model, num_parallel=num_parallel, batch_size=batch_size)
+    if host:
+        ai.ollama_host = host
+        ai.ollama_url = f"{host}/api/generate"
+        ai.model = ai._initialize_model(max_age=0)
+    if not ai.model:
+        sys.exit("Ollama is not reachable.")
+    ai.warm_up()
+
+    start = time.perf_counter()
+    results = list(ai.enhance_assignments(jobs))
+    wall = time.perf_counter() - start
+
+    counts = ai.token_counts
+    filled = sum(1 for _, result, _ in results if result['ai_notes'])
+    print(f"batch_size={batch_size:<3} wall {wall:7.2f}s  calls {counts['calls']:4d}  "
+          f"prompt tokens {counts['prompt_tokens']:7d}  generated tokens {counts['generated_tokens']:6d}  "
+          f"generated tok/s {counts['generated_tokens'] / wall:7.1f}  assignments/s {len(jobs) / wall:5.2f}  "
+          f"filled {filled}/{len(jobs)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--model", default="llama3.1")
+    parser.add_argument("--count", type=int, default=24, help="assignments per run")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[4, 8])
+    parser.add_argument("--num-parallel", type=int, default=None, help="defaults to OLLAMA_NUM_PARALLEL or 4")
+    parser.add_argument("--stand-in", action="store_true", help="benchmark against a local fake Ollama")
+    args = parser.parse_args()
+
+    host = start_stand_in() if args.stand_in else None
+    jobs = make_jobs(args.count)
+    for batch_size in [1] + [size for size in args.batch_sizes if size > 1]:
+        run(args.model, host, jobs, batch_size, args.num_parallel)
+
+
+if __name__ == "__main__":
+    main()
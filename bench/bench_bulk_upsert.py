@@ -0,0 +1,64 @@
+"""
+Time saving a sync's worth of assignments one row at a time against one bulk upsert.
+
+Each run uses a fresh database in a temporary directory and reports the
+per-row save_assignment loop (one transaction per row), a save_assignments_bulk
+insert, and a second save_assignments_bulk over the same ids (the update path
+every later sync takes).
+
+    python3 bench/bench_bulk_upsert.py --rows 10000 --profile wal
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend import Database, STORAGE_PROFILES
+
+
+def make_rows(count):
+    return [{
+        'assignment_id': str(i),
+        'title': f'Problem Set {i}',
+        'description': f'Complete problems {i} through {i + 10}. Show all work.',
+        'due_at': f'2026-{1 + i % 12:02d}-{1 + i % 28:02d}T23:59:00Z',
+        'course_name': f'COURSE {i % 6}',
+        'reminder_list': 'School'
+    } for i in range(count)]
+
+
+def timed(label, rows, call):
+    start = time.perf_counter()
+    call()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {elapsed:7.2f}s  {len(rows) / elapsed:9.0f} rows/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--profile", choices=sorted(STORAGE_PROFILES), default="wal")
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    print(f"{args.rows} rows, {args.profile} profile")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(db_path=str(Path(tmp) / "per_row.db"), storage_profile=args.profile)
+        timed("per-row save", rows, lambda: [db.save_assignment(row['assignment_id'], row['title'], row['description'],
+                                                                row['due_at'], row['course_name'], row['reminder_list'])
+                                             for row in rows])
+        db.close()
+
+        db = Database(db_path=str(Path(tmp) / "bulk.db"), storage_profile=args.profile)
+        timed("bulk insert", rows, lambda: db.save_assignments_bulk(rows))
+        timed("bulk re-upsert", rows, lambda: db.save_assignments_bulk(rows))
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
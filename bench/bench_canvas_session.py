@@ -0,0 +1,95 @@
+"""
+Compare a fresh connection per Canvas request against CanvasAPI's pooled session.
+
+Starts a local stand-in Canvas server that records the client address of
+every request, so the number of distinct TCP connections can be counted.
+Fetches assignments and discussions for every course twice: once with a
+bare requests.get per request on a worker pool, as the sync used to, and
+once through CanvasAPI.get_courses_items.
+
+    python3 bench/bench_canvas_session.py --courses 200 --workers 5
+
+Plain HTTP on loopback skips the TLS handshake that makes each new
+connection to a real Canvas host expensive, so the wall times understate
+the difference. The connection counts are the point.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend import CanvasAPI
+
+connections = set()
+
+
+class StandInCanvas(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0
+
+    def do_GET(self):
+        connections.add(self.client_address)
+        time.sleep(self.latency)
+        body = json.dumps([{"id": 1, "name": "Problem Set 1", "due_at": "2026-11-01T23:59:00Z"}]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stand_in(latency):
+    StandInCanvas.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInCanvas)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}/api/v1"
+
+
+def timed(label, call):
+    connections.clear()
+    start = time.perf_counter()
+    call()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {elapsed:7.2f}s  {len(connections):5d} connections")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=5, help="requests in flight for both runs")
+    parser.add_argument("--latency", type=float, default=0, help="seconds the stand-in waits before answering")
+    args = parser.parse_args()
+
+    base_url = start_stand_in(args.latency)
+    canvas_api = CanvasAPI("token", "canvas.example.com", max_concurrency=args.workers, base_url=base_url)
+    course_ids = list(range(args.courses))
+
+    def fetch_per_request(course_id):
+        for path, params in canvas_api._course_listings(course_id):
+            requests.get(f"{base_url}{path}", params=params, headers=canvas_api.headers, timeout=30).json()
+
+    def per_request():
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            list(executor.map(fetch_per_request, course_ids))
+
+    print(f"{args.courses} courses, 2 listings each, {args.workers} in flight")
+    timed("requests.get per request", per_request)
+    timed("CanvasAPI session", lambda: canvas_api.get_courses_items(course_ids))
+    canvas_api.close()
+
+
+if __name__ == "__main__":
+    main()
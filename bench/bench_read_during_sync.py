@@ -0,0 +1,76 @@
+"""
+Measure dashboard read latency while a sync holds a long write transaction.
+
+For each storage profile, a fresh temporary database is seeded with rows
+carrying long descriptions. A writer thread then inserts more rows inside
+one open transaction, pausing briefly between rows the way a sync does
+while it waits on Canvas. Meanwhile the main thread loops
+get_all_assignments and records how long each read takes.
+
+    python3 bench/bench_read_during_sync.py --seed 500 --writes 2500
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend import Database, STORAGE_PROFILES
+
+DESCRIPTION = 'd' * 2000
+
+
+def hold_write_transaction(db, first_id, count, pause):
+    with db.connection() as conn:
+        for i in range(first_id, first_id + count):
+            conn.execute('''
+                INSERT INTO assignments (assignment_id, title, description, due_at, course_name, reminder_list)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (str(i), f'HW {i}', DESCRIPTION, '2030-01-01T00:00:00Z', 'COURSE', 'School'))
+            time.sleep(pause)
+        conn.commit()
+
+
+def run(profile, seed, writes, pause):
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(db_path=str(Path(tmp) / "bench.db"), storage_profile=profile)
+        db.save_assignments_bulk([{
+            'assignment_id': str(i), 'title': f'HW {i}', 'description': DESCRIPTION,
+            'due_at': '2030-01-01T00:00:00Z', 'course_name': 'COURSE', 'reminder_list': 'School'
+        } for i in range(seed)])
+
+        writer = threading.Thread(target=hold_write_transaction, args=(db, seed, writes, pause))
+        writer.start()
+        time.sleep(0.05)
+
+        latencies = []
+        while writer.is_alive():
+            start = time.perf_counter()
+            db.get_all_assignments()
+            latencies.append((time.perf_counter() - start) * 1000)
+        writer.join()
+        db.close()
+
+    latencies.sort()
+    print(f"{profile:<9} reads {len(latencies):5d}  p50 {latencies[len(latencies) // 2]:8.1f}ms  "
+          f"p99 {latencies[int(len(latencies) * 0.99)]:8.1f}ms  max {latencies[-1]:8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", type=int, default=500, help="rows present before the sync starts")
+    parser.add_argument("--writes", type=int, default=2500, help="rows inserted inside the sync transaction")
+    parser.add_argument("--pause", type=float, default=0.0005, help="seconds between inserted rows")
+    parser.add_argument("--profiles", nargs="+", choices=sorted(STORAGE_PROFILES), default=["wal", "rollback"])
+    args = parser.parse_args()
+
+    for profile in args.profiles:
+        run(profile, args.seed, args.writes, args.pause)
+
+
+if __name__ == "__main__":
+    main()
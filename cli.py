@@ -6,14 +6,12 @@ Provides CLI tool for syncing assignments to Apple Reminders with optional AI su
 import os
 import sys
 import argparse
-import requests
 from datetime import datetime
 from zoneinfo import ZoneInfo
 EST = ZoneInfo("America/New_York")
 from pathlib import Path
 from dotenv import load_dotenv
-from backend import Database, AIEnhancer, RemindersManager, CanvasAPI, AssignmentProcessor
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from backend import Database, AIEnhancer, RemindersManager, CanvasAPI, CourseCatalog, AIJobQueue, AssignmentProcessor
 
 load_dotenv()
 
@@ -28,6 +26,7 @@ def get_due_date(item):
 def main():
     parser = argparse.ArgumentParser(description='Sync Canvas assignments to Apple Reminders')
     parser.add_argument('-ai', '--ai', action='store_true', help='Enable AI summaries for assignments')
+    parser.add_argument('--full', action='store_true', help='Re-fetch every item instead of only those changed since the last sync')
     args = parser.parse_args()
 
     api_token = os.getenv("CANVAS_API_TOKEN")
@@ -38,7 +37,7 @@ def main():
         sys.exit(1)
 
     db_path = str(Path(__file__).parent / "studysync.db")
-    db = Database(db_path=db_path)
+    db = Database(db_path=db_path, storage_profile=os.getenv("DB_STORAGE_PROFILE", "wal"))
 
     ai_enhancer = None
     if args.ai:
@@ -47,27 +46,25 @@ def main():
             print("ERROR: OLLAMA_MODEL not set in .env file. AI features require this.")
             sys.exit(1)
         try:
-            ai_enhancer = AIEnhancer(ollama_model=ollama_model)
+            ai_enhancer = AIEnhancer(ollama_model=ollama_model, cache=db)
             if not ai_enhancer.model:
                 print("WARNING: Ollama not available. Continuing without AI summaries.")
                 ai_enhancer = None
+            else:
+                # Load the model while Canvas is being fetched.
+                ai_enhancer.start_warm_up()
         except Exception as e:
             print(f"WARNING: Failed to initialize AI: {e}. Continuing without AI summaries.")
             ai_enhancer = None
 
     reminders_manager = RemindersManager()
-    canvas_api = CanvasAPI(api_token, canvas_domain)
+    canvas_api = CanvasAPI(api_token, canvas_domain, cache=db)
     processor = AssignmentProcessor(db, ai_enhancer, reminders_manager)
 
     college_name = db.get_setting("college_name") or ""
 
-    headers = {"Authorization": f"Bearer {api_token}"}
-    base_url = f"https://{canvas_domain}/api/v1"
-
     try:
-        response = requests.get(f"{base_url}/users/self/favorites/courses", headers=headers)
-        response.raise_for_status()
-        favorite_courses = response.json()
+        favorite_courses = [c for c in CourseCatalog(db, canvas_api).get_courses() if c['favorite']]
     except Exception as e:
         print(f"ERROR: Failed to fetch courses: {e}")
         sys.exit(1)
@@ -80,9 +77,9 @@ def main():
     new_courses = []
 
     for course in favorite_courses:
-        course_name = course.get("name", "Unnamed Course")
-        existing_mapping, enabled = db.get_course_mapping_with_enabled(course_name)
-        
+        course_name = course['name']
+        existing_mapping, enabled = course['reminder_list'], course['enabled']
+
         if existing_mapping and enabled == 1:
             course_mappings[course.get("id")] = {
                 'id': course.get("id"),
@@ -122,29 +119,64 @@ def main():
 
     now = datetime.now(EST)
     course_data = {}
+    failed_courses = []
+    bucket = None if args.full else 'future'
 
-    with ThreadPoolExecutor(max_workers=min(5, len(course_mappings))) as executor:
-        future_to_course = {
-            executor.submit(canvas_api.get_course_items, course_id): course_id
-            for course_id in course_mappings.keys()
-        }
-
-        for future in as_completed(future_to_course):
-            course_id = future_to_course[future]
-            course = course_mappings[course_id]
-            try:
-                items = future.result()
-                course_data[course_id] = {
-                    'course': course,
-                    'items': items
-                }
-            except Exception as e:
-                print(f"Error fetching course {course['name']}: {e}")
-                course_data[course_id] = {
-                    'course': course,
-                    'items': []
+    course_items = canvas_api.get_courses_items(course_mappings.keys(), bucket)
+
+    for course_id, course in course_mappings.items():
+        try:
+            items = course_items[course_id]
+            if isinstance(items, Exception):
+                raise items
+
+            watermarks = None if args.full else db.get_sync_watermarks(course_id)
+            items, watermarks = processor.filter_changed_items(items, watermarks)
+            course_data[course_id] = {
+                'course': course,
+                'items': items,
+                'watermarks': watermarks
+            }
+        except Exception as e:
+            print(f"Error fetching course {course['name']}: {e}")
+            failed_courses.append(course['name'])
+            course_data[course_id] = {
+                'course': course,
+                'items': [],
+                'watermarks': {}
+            }
+
+    ai_results = {}
+    if ai_enhancer:
+        jobs = {}
+        for data in course_data.values():
+            for item in data['items']:
+                should_process, assignment_data = processor.should_process_assignment(item, now)
+                if not should_process:
+                    continue
+
+                existing = db.get_assignment(assignment_data['assignment_id'])
+                if existing and (existing.deleted == 1 or (existing.ai_notes and existing.ai_notes.strip())):
+                    continue
+
+                jobs[assignment_data['assignment_id']] = {
+                    'assignment_id': assignment_data['assignment_id'],
+                    'title': assignment_data['title'],
+                    'description': assignment_data.get('description', ''),
+                    'course_name': data['course']['name'],
+                    'college_name': college_name,
+                    'due_at': assignment_data['due_at'],
+                    'priority': existing.priority if existing else None
                 }
 
+        if jobs:
+            print(f"Generating AI summaries for {len(jobs)} assignment(s), {ai_enhancer.num_parallel} at a time...")
+            ai_job_queue = AIJobQueue(db, ai_enhancer)
+            ai_job_queue.enqueue(jobs.values())
+            for event in ai_job_queue.drain():
+                if event['type'] == 'done' and (event['result']['ai_notes'] or event['key'] not in ai_results):
+                    ai_results[event['key']] = event['result']
+
     total_added = 0
     for course_id, _ in sorted_course_mappings:
         data = course_data[course_id]
@@ -159,66 +191,77 @@ def main():
         items.sort(key=get_due_date)
 
         course_added = 0
+        pending_rows = []
         for item in items:
             should_process, assignment_data = processor.should_process_assignment(item, now)
             if should_process:
                 assignment_id = assignment_data['assignment_id']
 
-                if db.is_assignment_permanently_deleted(assignment_id):
-                    continue
-
                 existing = db.get_assignment(assignment_id)
-                if existing and existing[14] == 1:
+                if existing and existing.deleted == 1:
                     continue
 
-                processor.process_assignment(assignment_data, reminder_list, course_name, college_name, args.ai)
-
-                assignment = db.get_assignment(assignment_id)
-                if assignment:
-                    try:
-                        due_at = assignment[4]
-                        title = assignment[2]
-                        ai_notes = assignment[7] if len(assignment) > 7 else ""
-
-                        if ai_notes:
-                            lines = ai_notes.split('\n')
-                            cleaned_lines = []
-                            skip_next = False
-                            for i, line in enumerate(lines):
-                                if skip_next:
-                                    skip_next = False
-                                    if line.strip() == '':
-                                        continue
-                                if line.startswith('Notes:'):
-                                    cleaned_lines.append(line.rstrip())
-                                    if i + 1 < len(lines) and lines[i + 1].strip() == '':
-                                        skip_next = True
-                                else:
-                                    cleaned_lines.append(line)
-                            ai_notes = '\n'.join(cleaned_lines).rstrip()
-
-                        due_date_utc = datetime.strptime(due_at, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=ZoneInfo("UTC"))
-                        local_due = due_date_utc.astimezone(EST)
-                        apple_due = local_due.strftime("%A, %B %d, %Y at %I:%M:%S %p")
-
-                        reminders_manager.add_reminder(title, apple_due, reminder_list, ai_notes or "")
-                        db.mark_reminder_added(assignment_id)
-                        course_added += 1
-                        print(f"  ✓ Added: {title} (due {local_due.strftime('%m/%d/%Y')})")
-                    except Exception as e:
-                        print(f"  ✗ Error adding reminder for {title}: {e}")
+                pending_rows.append(processor.build_assignment_row(
+                    assignment_data, reminder_list, course_name, college_name, args.ai,
+                    ai_result=ai_results.get(assignment_id)
+                ))
+
+        saved_ids = db.save_assignments_bulk(pending_rows)
+        db.set_sync_watermarks(course_id, data['watermarks'])
+
+        for assignment_id in saved_ids:
+            assignment = db.get_assignment(assignment_id)
+            if assignment:
+                try:
+                    due_at = assignment.due_at
+                    title = assignment.title
+                    ai_notes = assignment.ai_notes
+
+                    if ai_notes:
+                        lines = ai_notes.split('\n')
+                        cleaned_lines = []
+                        skip_next = False
+                        for i, line in enumerate(lines):
+                            if skip_next:
+                                skip_next = False
+                                if line.strip() == '':
+                                    continue
+                            if line.startswith('Notes:'):
+                                cleaned_lines.append(line.rstrip())
+                                if i + 1 < len(lines) and lines[i + 1].strip() == '':
+                                    skip_next = True
+                            else:
+                                cleaned_lines.append(line)
+                        ai_notes = '\n'.join(cleaned_lines).rstrip()
+
+                    due_date_utc = datetime.strptime(due_at, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=ZoneInfo("UTC"))
+                    local_due = due_date_utc.astimezone(EST)
+                    apple_due = local_due.strftime("%A, %B %d, %Y at %I:%M:%S %p")
+
+                    reminders_manager.add_reminder(title, apple_due, reminder_list, ai_notes or "")
+                    db.mark_reminder_added(assignment_id)
+                    course_added += 1
+                    print(f"  ✓ Added: {title} (due {local_due.strftime('%m/%d/%Y')})")
+                except Exception as e:
+                    print(f"  ✗ Error adding reminder for {title}: {e}")
 
         if course_added > 0:
             total_added += course_added
             print(f"\n{course_name}: {course_added} assignment(s) added to reminders")
 
     db.set_last_sync_timestamp(datetime.now(EST).isoformat())
+    db.checkpoint()
 
     if total_added > 0:
         print(f"\n✓ Successfully added {total_added} assignment(s) to Apple Reminders")
     else:
         print("\nNo new assignments to add")
 
+    if failed_courses:
+        print(f"\n✗ Could not fetch {len(failed_courses)} course(s) from Canvas: {', '.join(failed_courses)}")
+        print("  Their assignments were left unchanged; run the sync again later.")
+        sys.exit(1)
+
 if __name__ == '__main__':
     main()
 
@@ -0,0 +1,28 @@
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from backend import AI_JOB_LEASE_SECONDS, Database
+
+
+class ResetRunningAIJobsTests(unittest.TestCase):
+    def test_only_expired_leases_are_reset(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(db_path=str(Path(tmp) / "test.db"), pool_size=1)
+            db.enqueue_ai_jobs([{'assignment_id': str(i), 'title': f'HW {i}'} for i in range(2)])
+            db.claim_ai_jobs(2)
+            with db.connection() as conn:
+                conn.execute('UPDATE ai_jobs SET claimed_at = ? WHERE assignment_id = ?', (time.time() - AI_JOB_LEASE_SECONDS - 1, '0'))
+                conn.commit()
+
+            db.reset_running_ai_jobs()
+            with db.connection() as conn:
+                statuses = dict(conn.execute('SELECT assignment_id, status FROM ai_jobs'))
+            db.close()
+
+        self.assertEqual(statuses, {'0': 'pending', '1': 'running'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+import requests
+
+from backend import CanvasRateLimiter
+
+
+def make_response(headers):
+    response = requests.Response()
+    response.status_code = 200
+    response.headers.update(headers)
+    return response
+
+
+class CanvasRateLimiterTests(unittest.TestCase):
+    def test_low_bucket_halves_the_limit(self):
+        limiter = CanvasRateLimiter(8)
+        limiter.record(make_response({"X-Rate-Limit-Remaining": "100", "X-Request-Cost": "1.5"}))
+        self.assertEqual(limiter.limit, 4.0)
+        self.assertEqual(limiter.request_cost, 1.5)
+
+    def test_unparseable_headers_are_ignored(self):
+        limiter = CanvasRateLimiter(8)
+        limiter.limit = 4.0
+        limiter.record(make_response({"X-Rate-Limit-Remaining": "n/a", "X-Request-Cost": "1.5"}))
+        self.assertIsNone(limiter.remaining)
+        self.assertEqual(limiter.request_cost, 1.5)
+        self.assertEqual(limiter.limit, 4.25)
+
+    def test_throttled_response_halves_the_limit(self):
+        limiter = CanvasRateLimiter(8)
+        limiter.record(make_response({}), throttled=True)
+        self.assertEqual(limiter.limit, 4.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from backend import Database, _migrate_base_schema
+
+
+class ChangesSinceTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self.tmp.name) / "test.db")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rows_from_before_row_versions_are_in_the_first_delta(self):
+        conn = sqlite3.connect(self.db_path)
+        _migrate_base_schema(conn.cursor())
+        conn.execute('''
+            INSERT INTO assignments (assignment_id, title, due_at, course_name, reminder_list)
+            VALUES ('1', 'HW 1', '2026-11-01T23:59:00Z', 'COURSE', 'School')
+        ''')
+        conn.execute("INSERT INTO deleted_assignments (assignment_id, title, course_name) VALUES ('2', 'HW 2', 'COURSE')")
+        conn.commit()
+        conn.close()
+
+        db = Database(db_path=self.db_path, pool_size=1)
+        version, upserted, deleted = db.get_changes_since(0)
+        db.close()
+
+        self.assertEqual([assignment.assignment_id for assignment in upserted], ['1'])
+        self.assertEqual(deleted, ['2'])
+        self.assertGreater(version, 0)
+
+    def test_later_changes_only(self):
+        db = Database(db_path=self.db_path, pool_size=1)
+        db.save_assignment('1', 'HW 1', '', '2026-11-01T23:59:00Z', 'COURSE', 'School')
+        since = db.get_data_version()
+        db.save_assignment('2', 'HW 2', '', '2026-11-02T23:59:00Z', 'COURSE', 'School')
+        db.delete_assignment('1')
+        version, upserted, deleted = db.get_changes_since(since, fields=('status',))
+        db.close()
+
+        self.assertEqual([assignment.to_dict(('assignment_id', 'status')) for assignment in upserted],
+                         [{'assignment_id': '2', 'status': 'Not Started'}])
+        self.assertEqual(deleted, ['1'])
+        self.assertEqual(version, since + 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from backend import AssignmentProcessor, Database
+
+
+class FilterChangedItemsTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(db_path=str(Path(self.tmp.name) / "test.db"), pool_size=1)
+        self.processor = AssignmentProcessor(self.db, None, None)
+        self.db.save_assignment('1', 'HW 1', '', '2026-11-01T23:59:00Z', 'COURSE', 'School')
+        self.watermarks = {'assignment': '2026-10-10T00:00:00Z'}
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def test_skips_stored_items_older_than_the_watermark(self):
+        items = [{'id': 1, 'updated_at': '2026-10-01T00:00:00Z'}, {'id': 3, 'updated_at': '2026-10-12T00:00:00Z'}]
+        changed, watermarks = self.processor.filter_changed_items(items, self.watermarks)
+        self.assertEqual([item['id'] for item in changed], [3])
+        self.assertEqual(watermarks, {'assignment': '2026-10-12T00:00:00Z'})
+
+    def test_reimports_items_missing_locally(self):
+        self.db.permanently_delete_assignment('1')
+        self.db.restore_assignment('1')
+        changed, watermarks = self.processor.filter_changed_items([{'id': 1, 'updated_at': '2026-10-01T00:00:00Z'}], self.watermarks)
+        self.assertEqual([item['id'] for item in changed], [1])
+        self.assertEqual(watermarks, self.watermarks)
+
+    def test_full_sync_keeps_everything(self):
+        changed, _ = self.processor.filter_changed_items([{'id': 1, 'updated_at': '2026-10-01T00:00:00Z'}])
+        self.assertEqual(len(changed), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
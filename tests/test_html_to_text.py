@@ -0,0 +1,49 @@
+import unittest
+
+from backend import html_to_text
+
+
+class HtmlToTextTests(unittest.TestCase):
+    def test_tags_entities_and_whitespace(self):
+        self.assertEqual(html_to_text('<p>Read chapter&nbsp;3 &amp; answer</p>\n\n<p>  questions</p>'),
+                         'Read chapter 3 & answer questions')
+
+    def test_plain_text(self):
+        self.assertEqual(html_to_text('plain   text\n'), 'plain text')
+        self.assertEqual(html_to_text(''), '')
+        self.assertEqual(html_to_text(None), '')
+
+    def test_skipped_elements(self):
+        markup = ('<style>.a{color:red}</style><script>var x = "<b>";</script><p>Keep</p>'
+                  '<iframe src="https://example.com">Fallback</iframe><noscript>Enable JS</noscript><p>this</p>')
+        self.assertEqual(html_to_text(markup), 'Keep this')
+
+    def test_data_uris(self):
+        markup = '<p>See <img src="data:image/png;base64,iVBORw0KGgo=" alt="chart"> data:text/plain;base64,SGk= below</p>'
+        self.assertEqual(html_to_text(markup), 'See below')
+
+    def test_void_tags_do_not_start_skipping(self):
+        self.assertEqual(html_to_text('<p>Hello</p><embed src="x.swf"><p>World after embed</p>'),
+                         'Hello World after embed')
+        self.assertEqual(html_to_text('<p>a<br>b<hr>c<img src="x.png"> <input type="text">d</p>'), 'a b c d')
+
+    def test_self_closing_skipped_tag(self):
+        self.assertEqual(html_to_text('<p>Before</p><iframe src="x" /><p>After</p>'), 'Before After')
+
+    def test_unclosed_skipped_tag_ends_with_its_parent(self):
+        self.assertEqual(html_to_text('<div><iframe src="x">fallback</div><p>after</p>'), 'after')
+        self.assertEqual(html_to_text('<div><object data="x"><p>fallback</p></div>Kept'), 'Kept')
+
+    def test_unclosed_head_ends_at_body(self):
+        self.assertEqual(html_to_text('<html><head><title>Title</title><body><p>Body text</p></body></html>'),
+                         'Body text')
+
+    def test_truncates_at_word_boundary(self):
+        text = html_to_text('<p>' + 'word ' * 1000 + '</p>', max_chars=50)
+        self.assertTrue(text.endswith('...'))
+        self.assertLessEqual(len(text), 53)
+        self.assertTrue(all(word == 'word' for word in text[:-3].split()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import json
+import unittest
+
+from backend import parse_json_response
+
+
+class ParseJsonResponseTests(unittest.TestCase):
+    def test_clean_json(self):
+        self.assertEqual(parse_json_response('{"insights": "Plan ahead.", "confidence": 4}'),
+                         {"insights": "Plan ahead.", "confidence": 4})
+
+    def test_chatter_around_payload(self):
+        text = 'Here is your guide: {"insights": "Start early."} Let me know {if} you need more!'
+        self.assertEqual(parse_json_response(text), {"insights": "Start early."})
+
+    def test_leading_bracketed_chatter_is_skipped(self):
+        self.assertEqual(parse_json_response('[note] {curly} {"a": 1}'), {"a": 1})
+
+    def test_raw_control_characters_in_strings(self):
+        text = '{"insights": "Line one\nLine two\tTabbed\x07", "confidence": 3}'
+        self.assertEqual(parse_json_response(text), {"insights": "Line one\nLine two\tTabbed", "confidence": 3})
+
+    def test_truncated_payload_does_not_return_nested_fragment(self):
+        text = ('{"summary": "Busy week", "priorities": [{"title": "Essay", "due": "11-02-2026"}, '
+                '{"title": "Lab')
+        self.assertIsNone(parse_json_response(text))
+
+    def test_truncated_payload_after_chatter(self):
+        self.assertIsNone(parse_json_response('Sure! {"insights": {"week": {"hours": 4}}, "confidence": '))
+
+    def test_truncated_payload_with_raw_newlines(self):
+        self.assertIsNone(parse_json_response('{"insights": "Para one\n", "list": [{"a": 1}, {"b": "cut\n'))
+
+    def test_every_truncation_of_an_object_is_rejected(self):
+        payload = json.dumps({"insights": "Plan", "items": [{"title": "Essay"}, {"title": "Lab"}], "confidence": 4})
+        for cut in range(1, len(payload)):
+            with self.subTest(cut=cut):
+                self.assertIsNone(parse_json_response(payload[:cut]))
+
+    def test_batch_array(self):
+        self.assertEqual(parse_json_response('[{"id": "1"}, {"id": "2"}]'), [{"id": "1"}, {"id": "2"}])
+
+    def test_no_json(self):
+        self.assertIsNone(parse_json_response("nothing to see"))
+        self.assertIsNone(parse_json_response(""))
+        self.assertIsNone(parse_json_response(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
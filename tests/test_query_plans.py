@@ -0,0 +1,104 @@
+import re
+import tempfile
+import unittest
+from pathlib import Path
+
+from backend import Database, _sync_indexes
+
+# A plain "SCAN <table>" step reads every row; "SCAN <table> USING ... INDEX" walks an index in order.
+TABLE_SCAN = re.compile(r'^SCAN (assignments|deleted_assignments)(?! USING)')
+
+
+class QueryPlanTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.db = Database(db_path=str(Path(self.tmp.name) / "test.db"), pool_size=1)
+        self.db.save_assignments_bulk([{
+            'assignment_id': str(i), 'title': f'HW {i}', 'description': '', 'due_at': f'2026-11-{1 + i % 28:02d}T23:59:00Z',
+            'course_name': f'COURSE {i % 3}', 'reminder_list': 'School'
+        } for i in range(30)])
+        self.db.delete_assignment('0')
+
+    def tearDown(self):
+        self.db.close()
+        self.tmp.cleanup()
+
+    def traced_queries(self, call):
+        """Run call and return the expanded SQL of every SELECT it issued."""
+        statements = []
+        with self.db.connection() as conn:
+            conn.set_trace_callback(statements.append)
+        try:
+            call()
+        finally:
+            with self.db.connection() as conn:
+                conn.set_trace_callback(None)
+        return [sql for sql in statements if sql.lstrip().upper().startswith('SELECT')]
+
+    def assert_no_table_scan(self, call):
+        queries = self.traced_queries(call)
+        self.assertTrue(queries, "no queries were traced")
+        with self.db.connection() as conn:
+            for sql in queries:
+                plan = [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}')]
+                scans = [step for step in plan if TABLE_SCAN.match(step)]
+                self.assertFalse(scans, f"table scan in plan for {sql.strip()}: {plan}")
+
+    def test_dashboard_list(self):
+        self.assert_no_table_scan(lambda: self.db.get_all_assignments())
+
+    def test_assignments_page(self):
+        self.assert_no_table_scan(lambda: self.db.get_assignments_page(limit=10))
+        self.assert_no_table_scan(lambda: self.db.get_assignments_page(limit=10, after=('2026-11-05T23:59:00Z', '5')))
+
+    def test_assignments_page_by_course(self):
+        self.assert_no_table_scan(lambda: self.db.get_assignments_page(limit=10, course_name='COURSE 1'))
+
+    def test_changes_since(self):
+        self.assert_no_table_scan(lambda: self.db.get_changes_since(1))
+
+    def test_single_assignment_lookups(self):
+        self.assert_no_table_scan(lambda: self.db.get_assignment('5'))
+        self.assert_no_table_scan(lambda: self.db.is_assignment_permanently_deleted('0'))
+
+    def test_bulk_upsert_tombstone_check(self):
+        self.assert_no_table_scan(lambda: self.db.save_assignments_bulk([{
+            'assignment_id': '5', 'title': 'HW 5', 'due_at': '2026-11-06T23:59:00Z',
+            'course_name': 'COURSE 2', 'reminder_list': 'School'
+        }]))
+
+    def test_deleted_list(self):
+        self.assert_no_table_scan(lambda: self.db.get_deleted_assignments())
+
+
+class SyncIndexesTests(unittest.TestCase):
+    def test_only_manages_indexes_on_its_own_tables(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(db_path=str(Path(tmp) / "test.db"), pool_size=1)
+            with db.connection() as conn:
+                before = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx%'")}
+                _sync_indexes({"idx_assignments_due": "assignments (due_at)"})(conn.cursor())
+                after = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx%'")}
+            db.close()
+
+        self.assertIn("idx_ai_jobs_status_due_priority", before)
+        dropped = before - after
+        self.assertTrue(dropped)
+        self.assertTrue(all(name.startswith("idx_assignments_") for name in dropped), dropped)
+        self.assertIn("idx_assignments_due", after)
+
+    def test_steps_are_frozen(self):
+        indexes = {"idx_assignments_due": "assignments (due_at)"}
+        step = _sync_indexes(indexes)
+        indexes["idx_assignments_title"] = "assignments (title)"
+        with tempfile.TemporaryDirectory() as tmp:
+            db = Database(db_path=str(Path(tmp) / "test.db"), pool_size=1)
+            with db.connection() as conn:
+                step(conn.cursor())
+                names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+            db.close()
+        self.assertNotIn("idx_assignments_title", names)
+
+
+if __name__ == '__main__':
+    unittest.main()